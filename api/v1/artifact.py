@@ -4,7 +4,6 @@ from flask import send_file, request
 from io import BytesIO
 from hurry.filesize import size
 from pylon.core.tools import log
-from botocore.exceptions import ClientError
 
 from tools import MinioClient, api_tools, auth
 
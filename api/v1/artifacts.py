@@ -3,7 +3,9 @@ from flask import request
 from hurry.filesize import size
 
 from tools import MinioClient, api_tools, auth
-from pylon.core.tools import log
+
+from ...s3.utils import forget_missing_object
+from ...utils.utils import remove_files
 
 
 def calculate_readable_retention_policy(days: int) -> dict:
@@ -73,6 +75,7 @@ class ProjectAPI(api_tools.APIModeHandler):
                 client=mc,
                 create_if_not_exists=request.args.get('create_if_not_exists', True)
             )
+            forget_missing_object(mc, bucket, file_name)
         if not file_name:
             return {'error': 'No file provided'}, 400
         file_size = mc.get_file_size(bucket, file_name)
@@ -96,8 +99,9 @@ class ProjectAPI(api_tools.APIModeHandler):
         if not args.get("fname[]"):
             mc.remove_bucket(bucket)
         else:
-            for fname in args.getlist("fname[]"):
-                mc.remove_file(bucket, fname)
+            failed = remove_files(mc, bucket, args.getlist("fname[]"))
+            if failed:
+                return {'error': 'Failed to delete some files', 'failed': failed}, 500
         return {"message": "Deleted", "size": size(mc.get_bucket_size(bucket))}, 200
 
 
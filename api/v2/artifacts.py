@@ -5,7 +5,7 @@ from hurry.filesize import size
 from tools import MinioClient, api_tools, auth
 from pylon.core.tools import log
 
-from ...utils.utils import make_filepath
+from ...utils.utils import make_filepath, remove_files
 
 
 def calculate_readable_retention_policy(days: int) -> dict:
@@ -134,8 +134,9 @@ class ProjectAPI(api_tools.APIModeHandler):
         if not filenames:
             mc.remove_bucket(bucket)
         else:
-            for fname in filenames:
-                mc.remove_file(bucket, fname)
+            failed = remove_files(mc, bucket, filenames)
+            if failed:
+                return {'error': 'Failed to delete some files', 'failed': failed}, 500
 
         return {"message": "Deleted", "size": size(mc.get_bucket_size(bucket))}, 200
 
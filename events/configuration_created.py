@@ -1,4 +1,4 @@
-from pylon.core.tools import web, log
+from pylon.core.tools import web
 
 from ..models.pd.configuration import configuration_record
 
@@ -0,0 +1,14 @@
+from pylon.core.tools import web
+
+from ..s3.utils import invalidate_minio_clients
+
+
+class Event:
+    @web.event('configuration_updated')
+    def configuration_updated(self, context, event, payload: dict):
+        # Storage clients are cached per project - rebuild them with the new settings
+        invalidate_minio_clients(payload['project_id'])
+
+    @web.event('configuration_deleted')
+    def configuration_deleted(self, context, event, payload: dict):
+        invalidate_minio_clients(payload['project_id'])
@@ -21,11 +21,8 @@ import flask
 from pylon.core.tools import log
 from pylon.core.tools import web
 
-from tools import MinioClient
-
 from ..s3.auth import verify_s3_auth
 from ..s3 import responses
-from ..s3.utils import parse_bucket_and_key
 from ..s3.handlers.bucket import BucketHandler
 from ..s3.handlers.object import ObjectHandler
 from ..s3.handlers.multipart import MultipartHandler
@@ -20,6 +20,7 @@ from hurry.filesize import size
 from tools import MinioClient, api_tools
 from pylon.core.tools import log, web
 
+from ..s3.utils import forget_missing_object
 from ..utils.utils import parse_filepath, make_filepath
 
 
@@ -152,11 +153,12 @@ class RPC:
                 client=mc,
                 create_if_not_exists=False  # Already handled above
             )
+            forget_missing_object(mc, bucket, filename)
 
             # Get uploaded file size in bytes
             file_size_bytes = mc.get_file_size(bucket, filename) if filename else 0
 
-            log.info(f"Uploaded file {bucket}/{filename}")
+            log.info("Uploaded file %s/%s", bucket, filename)
 
             return {
                 "filepath": make_filepath(bucket, filename),
@@ -28,6 +28,8 @@ from pylon.core.tools import log
 
 from tools import context, auth
 
+from .responses import error_response
+
 
 class S3Credentials(NamedTuple):
     """Parsed S3 credentials from request"""
@@ -231,7 +233,8 @@ def get_payload_hash() -> str:
     if content_sha256:
         return content_sha256
 
-    # Calculate hash from body
+    # Calculate hash from body - mark it read, so handlers reuse the cached data
+    g.s3_body_consumed = True
     return hash_payload(request.get_data())
 
 
@@ -518,8 +521,6 @@ def s3_auth_required(f):
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        from .responses import error_response
-
         auth_context, error = authenticate_s3_request()
 
         if error:
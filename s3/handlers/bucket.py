@@ -19,18 +19,32 @@
 from datetime import datetime
 from flask import Response
 
+from botocore.exceptions import ClientError
 from pylon.core.tools import log
-from tools import MinioClient
 
+from ..utils import (
+    get_minio_client,
+    stat_object,
+    get_error_code,
+    list_bucket_cached,
+    bucket_exists,
+    invalidate_bucket_list_cache,
+    forget_missing_object
+)
 from ..responses import (
     list_buckets_response,
     create_bucket_response,
+    bucket_location_response,
     delete_response,
     head_response,
     error_response
 )
 
 
+# Storage error codes meaning the bucket is already there
+BUCKET_EXISTS_CODES = ('BucketAlreadyOwnedByYou', 'BucketAlreadyExists')
+
+
 class BucketHandler:
     """Handler for S3 bucket operations"""
 
@@ -46,7 +60,7 @@ class BucketHandler:
         self.project = project
         self.owner_id = owner_id or 0
         self.owner_name = owner_name or ''
-        self.mc = MinioClient(project)
+        self.mc = get_minio_client(project)
 
     def list_buckets(self) -> Response:
         """
@@ -55,14 +69,15 @@ class BucketHandler:
         S3 Operation: GET /
         """
         try:
-            buckets = self.mc.list_bucket()
+            buckets = list_bucket_cached(self.mc, refresh=True)
 
             # Build bucket list with metadata
+            now = datetime.utcnow()
             bucket_list = []
             for bucket_name in buckets:
                 bucket_info = {
                     'name': bucket_name,
-                    'creation_date': datetime.utcnow()  # MinIO doesn't track creation date
+                    'creation_date': now  # MinIO doesn't track creation date
                 }
 
                 # Get bucket size
@@ -70,7 +85,7 @@ class BucketHandler:
                     bucket_size = self.mc.get_bucket_size(bucket_name)
                     bucket_info['size'] = bucket_size
                 except Exception as size_err:
-                    log.debug(f"Failed to get size for bucket {bucket_name}: {size_err}")
+                    log.debug("Failed to get size for bucket %s: %s", bucket_name, size_err)
                     bucket_info['size'] = 0
 
                 # Try to get lifecycle/retention info
@@ -83,7 +98,7 @@ class BucketHandler:
                         if retention_days:
                             bucket_info['retention_days'] = retention_days
                 except Exception as lifecycle_err:
-                    log.debug(f"No lifecycle policy for bucket {bucket_name}: {lifecycle_err}")
+                    log.debug("No lifecycle policy for bucket %s: %s", bucket_name, lifecycle_err)
                     bucket_info['retention_days'] = None
 
                 bucket_list.append(bucket_info)
@@ -109,18 +124,35 @@ class BucketHandler:
         S3 Operation: PUT /{bucket}
         """
         try:
-            # Check if bucket already exists
-            existing_buckets = self.mc.list_bucket()
-            if bucket_name in existing_buckets:
+            # Create the bucket - storage reports an existing bucket atomically
+            try:
+                result = self.mc.create_bucket(bucket=bucket_name, bucket_type='local')
+            except ClientError as e:
+                result = e
+            invalidate_bucket_list_cache(self.mc)
+
+            # MinioClient may raise or return the storage error as a string
+            if isinstance(result, ClientError):
+                error_code = get_error_code(result)
+            elif isinstance(result, str):
+                error_code = next((code for code in BUCKET_EXISTS_CODES if code in result), result)
+            else:
+                error_code = None
+
+            if error_code in BUCKET_EXISTS_CODES:
                 return error_response(
                     code='BucketAlreadyExists',
                     message=f'Bucket {bucket_name} already exists',
                     resource=f'/{bucket_name}',
                     status_code=409
                 )
-
-            # Create the bucket
-            result = self.mc.create_bucket(bucket=bucket_name, bucket_type='local')
+            if error_code is not None:
+                return error_response(
+                    code='InternalError',
+                    message=str(result),
+                    resource=f'/{bucket_name}',
+                    status_code=500
+                )
 
             if isinstance(result, dict) and result.get('error'):
                 return error_response(
@@ -151,19 +183,23 @@ class BucketHandler:
         Note: Bucket must be empty before deletion.
         """
         try:
-            # Check if bucket exists
-            existing_buckets = self.mc.list_bucket()
-            if bucket_name not in existing_buckets:
-                return error_response(
-                    code='NoSuchBucket',
-                    message=f'Bucket {bucket_name} does not exist',
-                    resource=f'/{bucket_name}',
-                    status_code=404
+            # Check if bucket is empty - a single key is enough, and storage
+            # reports a missing bucket on the same call
+            try:
+                listing = self.mc.s3_client.list_objects_v2(
+                    Bucket=self.mc.format_bucket_name(bucket_name),
+                    MaxKeys=1
                 )
-
-            # Check if bucket is empty
-            files = self.mc.list_files(bucket_name)
-            if files:
+            except ClientError as e:
+                if get_error_code(e) == 'NoSuchBucket':
+                    return error_response(
+                        code='NoSuchBucket',
+                        message=f'Bucket {bucket_name} does not exist',
+                        resource=f'/{bucket_name}',
+                        status_code=404
+                    )
+                raise
+            if listing.get('KeyCount', 0):
                 return error_response(
                     code='BucketNotEmpty',
                     message='The bucket you tried to delete is not empty',
@@ -173,6 +209,7 @@ class BucketHandler:
 
             # Delete the bucket
             self.mc.remove_bucket(bucket_name)
+            invalidate_bucket_list_cache(self.mc)
             return delete_response()
 
         except Exception as e:
@@ -194,8 +231,7 @@ class BucketHandler:
         """
         try:
             # Check if bucket exists
-            existing_buckets = self.mc.list_bucket()
-            if bucket_name not in existing_buckets:
+            if not bucket_exists(self.mc, bucket_name):
                 return error_response(
                     code='NoSuchBucket',
                     message=f'Bucket {bucket_name} does not exist',
@@ -222,8 +258,7 @@ class BucketHandler:
         """
         try:
             # Check if bucket exists
-            existing_buckets = self.mc.list_bucket()
-            if bucket_name not in existing_buckets:
+            if not bucket_exists(self.mc, bucket_name):
                 return error_response(
                     code='NoSuchBucket',
                     message=f'Bucket {bucket_name} does not exist',
@@ -231,13 +266,7 @@ class BucketHandler:
                     status_code=404
                 )
 
-            # Return location constraint XML
-            from xml.etree.ElementTree import Element, tostring
-            root = Element('LocationConstraint', xmlns='http://s3.amazonaws.com/doc/2006-03-01/')
-            root.text = region
-
-            xml_str = b'<?xml version="1.0" encoding="UTF-8"?>\n' + tostring(root, encoding='utf-8')
-            return Response(xml_str, status=200, mimetype='application/xml')
+            return bucket_location_response(region)
 
         except Exception as e:
             log.error("GetBucketLocation failed: %s", e)
@@ -257,8 +286,7 @@ class BucketHandler:
         """
         try:
             # Check if source bucket exists
-            existing_buckets = self.mc.list_bucket()
-            if source_bucket not in existing_buckets:
+            if not bucket_exists(self.mc, source_bucket):
                 return error_response(
                     code='NoSuchBucket',
                     message=f'Source bucket {source_bucket} does not exist',
@@ -266,19 +294,8 @@ class BucketHandler:
                     status_code=404
                 )
 
-            # Check if destination bucket exists
-            if dest_bucket not in existing_buckets:
-                return error_response(
-                    code='NoSuchBucket',
-                    message=f'Destination bucket {dest_bucket} does not exist',
-                    resource=f'/{dest_bucket}/{dest_key}',
-                    status_code=404
-                )
-
             # Check if source object exists
-            source_files = self.mc.list_files(source_bucket)
-            source_exists = any(f['name'] == source_key for f in source_files)
-            if not source_exists:
+            if stat_object(self.mc, source_bucket, source_key) is None:
                 return error_response(
                     code='NoSuchKey',
                     message='Source key does not exist',
@@ -288,9 +305,26 @@ class BucketHandler:
 
             # Perform server-side move (copy + delete)
             self.mc.move_object(source_bucket, source_key, dest_bucket, dest_key)
+            forget_missing_object(self.mc, dest_bucket, dest_key)
 
             return Response('', status=200)
 
+        except ClientError as e:
+            # The source bucket was checked above, so a missing bucket is the destination
+            if get_error_code(e) == 'NoSuchBucket':
+                return error_response(
+                    code='NoSuchBucket',
+                    message=f'Destination bucket {dest_bucket} does not exist',
+                    resource=f'/{dest_bucket}/{dest_key}',
+                    status_code=404
+                )
+            log.error("MoveObject failed: %s", e)
+            return error_response(
+                code='InternalError',
+                message=str(e),
+                resource=f'/{source_bucket}/{source_key}',
+                status_code=500
+            )
         except ValueError as e:
             # Handle size limit errors
             log.warning("MoveObject size limit exceeded: %s", e)
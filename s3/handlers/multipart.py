@@ -17,16 +17,41 @@
 """ S3 Multipart Upload Operations Handler """
 
 import uuid
-import hashlib
 import json
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional
-from xml.etree.ElementTree import fromstring
 from flask import request, Response
 
+from botocore.exceptions import ClientError
 from pylon.core.tools import log
-from tools import MinioClient, context
-
+from tools import config as c
+
+try:
+    import redis  # pylint: disable=E0401
+except ImportError:
+    redis = None
+
+try:
+    from lxml import etree as lxml_etree  # pylint: disable=E0401
+except ImportError:
+    lxml_etree = None
+    from xml.etree.ElementTree import fromstring
+
+try:
+    import orjson  # pylint: disable=E0401
+except ImportError:
+    orjson = None
+
+from ..utils import (
+    get_minio_client,
+    spool_request_body,
+    guess_content_type,
+    bucket_exists,
+    get_error_code,
+    forget_missing_object
+)
 from ..responses import (
     initiate_multipart_upload_response,
     upload_part_response,
@@ -39,8 +64,183 @@ from ..responses import (
 
 # Redis key prefix for multipart uploads
 MULTIPART_PREFIX = 's3:multipart:'
-MULTIPART_PART_PREFIX = 's3:multipart:part:'
 MULTIPART_EXPIRE_SECONDS = 24 * 60 * 60  # 24 hours
+# How often a bucket is swept for storage uploads whose metadata has expired
+MULTIPART_SWEEP_INTERVAL = 60 * 60  # 1 hour
+
+# Storage errors on completion caused by the request - the upload is kept for a retry
+COMPLETE_CLIENT_ERROR_CODES = ('InvalidPart', 'InvalidPartOrder', 'EntityTooSmall', 'MalformedXML')
+
+# Shared Redis client (holds its own connection pool), created on first use
+_redis_client = None
+
+# In-memory fallback when Redis is unavailable, least recently active first:
+# upload_id -> (expires_at, upload_data, storage client)
+MULTIPART_LOCAL_MAX_UPLOADS = 10_000
+_local_uploads = {}
+_local_uploads_lock = threading.Lock()
+
+# Request bodies are untrusted: never resolve entities or fetch anything
+_XML_PARSER = (
+    lxml_etree.XMLParser(resolve_entities=False, no_network=True)
+    if lxml_etree is not None else None
+)
+
+# Storage bucket -> time of its last sweep for expired storage uploads
+_last_sweeps = {}
+_last_sweeps_lock = threading.Lock()
+
+
+def _dumps(data: Dict) -> bytes:
+    """Serialize upload metadata for Redis (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(raw: bytes) -> Dict:
+    """Deserialize upload metadata stored in Redis"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _parse_xml(body: bytes):
+    """Parse an XML request body (lxml with the hardened parser when available)"""
+    if lxml_etree is not None:
+        return lxml_etree.fromstring(body, parser=_XML_PARSER)
+    return fromstring(body)
+
+
+def _abort_storage_upload(mc, upload_data: Dict):
+    """Abort the native storage upload behind upload metadata, discarding its parts"""
+    try:
+        mc.s3_client.abort_multipart_upload(
+            Bucket=mc.format_bucket_name(upload_data['bucket']),
+            Key=upload_data['key'],
+            UploadId=upload_data['storage_upload_id']
+        )
+    except Exception as e:
+        log.debug(
+            "Storage multipart abort failed for %s/%s: %s",
+            upload_data['bucket'], upload_data['key'], e
+        )
+
+
+def _last_storage_activity(mc, storage_bucket: str, upload: Dict) -> datetime:
+    """Time a storage upload was initiated or last received a part"""
+    latest = upload['Initiated']
+    params = {'Bucket': storage_bucket, 'Key': upload['Key'], 'UploadId': upload['UploadId']}
+    while True:
+        listing = mc.s3_client.list_parts(**params)
+        for part in listing.get('Parts', []):
+            latest = max(latest, part['LastModified'])
+        if not listing.get('IsTruncated'):
+            return latest
+        params['PartNumberMarker'] = listing['NextPartNumberMarker']
+
+
+def _sweep_expired_storage_uploads(mc, bucket: str):
+    """
+    Abort storage uploads in the bucket whose metadata has expired.
+
+    Metadata lives for MULTIPART_EXPIRE_SECONDS after the last uploaded part.
+    Once it is gone an upload can be neither completed nor aborted through
+    this API, so its parts would stay in storage for good. Runs at most once
+    per MULTIPART_SWEEP_INTERVAL for each bucket.
+    """
+    storage_bucket = mc.format_bucket_name(bucket)
+    now = time.monotonic()
+    with _last_sweeps_lock:
+        last_sweep = _last_sweeps.get(storage_bucket)
+        if last_sweep is not None and now - last_sweep < MULTIPART_SWEEP_INTERVAL:
+            return
+        _last_sweeps[storage_bucket] = now
+
+    # Metadata is refreshed just after storage records a part, so allow a
+    # sweep interval of slack before treating an upload as orphaned
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=MULTIPART_EXPIRE_SECONDS + MULTIPART_SWEEP_INTERVAL
+    )
+    params = {'Bucket': storage_bucket}
+    try:
+        while True:
+            listing = mc.s3_client.list_multipart_uploads(**params)
+            for upload in listing.get('Uploads', []):
+                # Only uploads idle since before the cutoff - checked part by
+                # part for the few old enough to be candidates at all
+                if upload['Initiated'] < cutoff and \
+                        _last_storage_activity(mc, storage_bucket, upload) < cutoff:
+                    mc.s3_client.abort_multipart_upload(
+                        Bucket=storage_bucket,
+                        Key=upload['Key'],
+                        UploadId=upload['UploadId']
+                    )
+            if not listing.get('IsTruncated'):
+                break
+            params['KeyMarker'] = listing.get('NextKeyMarker', '')
+            params['UploadIdMarker'] = listing.get('NextUploadIdMarker', '')
+    except Exception as e:
+        log.warning("Sweeping expired multipart uploads in %s failed: %s", bucket, e)
+
+
+def _local_get(upload_id: str, with_parts: bool = False) -> Optional[Dict]:
+    """Get upload metadata from the in-memory fallback store"""
+    with _local_uploads_lock:
+        entry = _local_uploads.get(upload_id)
+        if entry is None:
+            return None
+        expires_at, upload_data, _ = entry
+        if expires_at < time.monotonic():
+            del _local_uploads[upload_id]
+            return None
+        if not with_parts:
+            return upload_data
+        return {
+            **upload_data,
+            'parts': dict(sorted(upload_data['parts'].items(), key=lambda item: int(item[0])))
+        }
+
+
+def _local_put(mc, upload_id: str, upload_data: Dict):
+    """
+    Store upload metadata in the in-memory fallback store.
+
+    Expired uploads are evicted, then the least recently active ones while the
+    store holds MULTIPART_LOCAL_MAX_UPLOADS or more; their storage uploads are
+    aborted.
+    """
+    now = time.monotonic()
+    evicted = []
+    with _local_uploads_lock:
+        # Entries are (re-)inserted with a fresh expiry, so the first one expires first
+        while _local_uploads:
+            oldest = next(iter(_local_uploads))
+            if _local_uploads[oldest][0] >= now and len(_local_uploads) < MULTIPART_LOCAL_MAX_UPLOADS:
+                break
+            evicted.append(_local_uploads.pop(oldest))
+        _local_uploads[upload_id] = (now + MULTIPART_EXPIRE_SECONDS, upload_data, mc)
+
+    for _, evicted_data, evicted_mc in evicted:
+        _abort_storage_upload(evicted_mc, evicted_data)
+
+
+def _local_put_part(upload_id: str, part_number: int, part_info: Dict):
+    """Record a part in the in-memory fallback store, extending the upload's expiry"""
+    with _local_uploads_lock:
+        entry = _local_uploads.pop(upload_id, None)
+        if entry is not None:
+            entry[1]['parts'][str(part_number)] = part_info
+            # Re-inserted at the end, so the store stays ordered by expiry
+            _local_uploads[upload_id] = (
+                time.monotonic() + MULTIPART_EXPIRE_SECONDS, entry[1], entry[2]
+            )
+
+
+def _local_pop(upload_id: str):
+    """Remove an upload from the in-memory fallback store"""
+    with _local_uploads_lock:
+        _local_uploads.pop(upload_id, None)
 
 
 class MultipartHandler:
@@ -58,20 +258,25 @@ class MultipartHandler:
         self.project = project
         self.project_id = project_id or 0
         self.user_id = user_id or 0
-        self.mc = MinioClient(project)
+        self.mc = get_minio_client(project)
 
     @staticmethod
     def _get_redis():
         """Get Redis client from context"""
+        global _redis_client  # pylint: disable=W0603
+        if _redis_client is not None:
+            return _redis_client
+        if redis is None:
+            log.warning("Redis not available for multipart uploads: redis package is not installed")
+            return None
         try:
-            from tools import config as c
-            import redis
-            return redis.Redis(
+            _redis_client = redis.Redis(
                 host=c.REDIS_HOST,
                 port=c.REDIS_PORT,
                 password=c.REDIS_PASSWORD,
                 db=0
             )
+            return _redis_client
         except Exception as e:
             log.warning("Redis not available for multipart uploads: %s", e)
             return None
@@ -82,14 +287,14 @@ class MultipartHandler:
         return f"{MULTIPART_PREFIX}{upload_id}"
 
     @staticmethod
-    def _get_part_key(upload_id: str, part_number: int) -> str:
-        """Get Redis key for part data"""
-        return f"{MULTIPART_PART_PREFIX}{upload_id}:{part_number}"
+    def _get_parts_key(upload_id: str) -> str:
+        """Get Redis key for the sorted set of uploaded part info"""
+        return f"{MULTIPART_PREFIX}{upload_id}:parts"
 
     @staticmethod
-    def _calculate_etag(data: bytes) -> str:
-        """Calculate ETag (MD5 hash) for part"""
-        return f'"{hashlib.md5(data).hexdigest()}"'
+    def _normalize_etag(etag: str) -> str:
+        """Return ETag wrapped in double quotes"""
+        return f'"{etag.strip(chr(34))}"'
 
     def create_multipart_upload(self, bucket_name: str, key: str) -> Response:
         """
@@ -101,8 +306,7 @@ class MultipartHandler:
         """
         try:
             # Check if bucket exists
-            existing_buckets = self.mc.list_bucket()
-            if bucket_name not in existing_buckets:
+            if not bucket_exists(self.mc, bucket_name):
                 return error_response(
                     code='NoSuchBucket',
                     message=f'Bucket {bucket_name} does not exist',
@@ -110,38 +314,45 @@ class MultipartHandler:
                     status_code=404
                 )
 
+            # Discard storage uploads left behind by expired metadata
+            _sweep_expired_storage_uploads(self.mc, bucket_name)
+
+            # Start native multipart upload in storage - parts go straight to MinIO
+            storage_upload = self.mc.s3_client.create_multipart_upload(
+                Bucket=self.mc.format_bucket_name(bucket_name),
+                Key=key,
+                ContentType=guess_content_type(key)
+            )
+
             # Generate upload ID
-            upload_id = str(uuid.uuid4())
-
-            # Store upload metadata in Redis
-            redis_client = self._get_redis()
-            if redis_client:
-                upload_data = {
-                    'bucket': bucket_name,
-                    'key': key,
-                    'project_id': self.project_id,
-                    'user_id': self.user_id,
-                    'created_at': datetime.utcnow().isoformat(),
-                    'parts': {}
-                }
-                redis_client.setex(
-                    self._get_upload_key(upload_id),
-                    MULTIPART_EXPIRE_SECONDS,
-                    json.dumps(upload_data)
-                )
-            else:
-                # Fallback: store in memory (not recommended for production)
-                log.warning("Redis not available, multipart state will be lost on restart")
-                if not hasattr(context, '_multipart_uploads'):
-                    context._multipart_uploads = {}
-                context._multipart_uploads[upload_id] = {
-                    'bucket': bucket_name,
-                    'key': key,
-                    'project_id': self.project_id,
-                    'user_id': self.user_id,
-                    'created_at': datetime.utcnow().isoformat(),
-                    'parts': {}
-                }
+            upload_id = uuid.uuid4().hex
+
+            upload_data = {
+                'bucket': bucket_name,
+                'key': key,
+                'storage_upload_id': storage_upload['UploadId'],
+                'project_id': self.project_id,
+                'user_id': self.user_id,
+                'created_at': datetime.utcnow().isoformat()
+            }
+
+            # Store upload metadata in Redis - without it the storage upload
+            # could never be completed or aborted, so drop it on failure
+            try:
+                redis_client = self._get_redis()
+                if redis_client:
+                    redis_client.setex(
+                        self._get_upload_key(upload_id),
+                        MULTIPART_EXPIRE_SECONDS,
+                        _dumps(upload_data)
+                    )
+                else:
+                    # Fallback: store in memory (not recommended for production)
+                    log.warning("Redis not available, multipart state will be lost on restart")
+                    _local_put(self.mc, upload_id, {**upload_data, 'parts': {}})
+            except Exception:
+                _abort_storage_upload(self.mc, upload_data)
+                raise
 
             return initiate_multipart_upload_response(
                 bucket=bucket_name,
@@ -158,47 +369,69 @@ class MultipartHandler:
                 status_code=500
             )
 
-    def _get_upload_data(self, upload_id: str) -> Optional[Dict]:
-        """Get upload metadata from Redis or memory"""
+    def _get_upload_data(self, upload_id: str, with_parts: bool = False) -> Optional[Dict]:
+        """
+        Get upload metadata from Redis or memory.
+
+        With with_parts=True the part info map is loaded into data['parts']
+        ordered by part number, fetched from Redis in the same round trip
+        as the metadata.
+
+        Uploads started before parts were stored natively in storage have no
+        storage upload to continue and are reported as not existing.
+        """
         redis_client = self._get_redis()
         if redis_client:
-            data = redis_client.get(self._get_upload_key(upload_id))
-            if data:
-                return json.loads(data)
-        else:
-            if hasattr(context, '_multipart_uploads'):
-                return context._multipart_uploads.get(upload_id)
-        return None
+            if not with_parts:
+                data = redis_client.get(self._get_upload_key(upload_id))
+                if not data:
+                    return None
+                upload_data = _loads(data)
+                return upload_data if 'storage_upload_id' in upload_data else None
+
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.get(self._get_upload_key(upload_id))
+            pipe.zrange(self._get_parts_key(upload_id), 0, -1, withscores=True)
+            data, parts = pipe.execute()
+            if not data:
+                return None
+            upload_data = _loads(data)
+            if 'storage_upload_id' not in upload_data:
+                return None
+            # Parts are scored by part number, so they come back already sorted
+            upload_data['parts'] = {
+                str(int(part_number)): _loads(part_info)
+                for part_info, part_number in parts
+            }
+            return upload_data
+        return _local_get(upload_id, with_parts)
 
-    def _save_upload_data(self, upload_id: str, data: Dict):
-        """Save upload metadata to Redis or memory"""
+    def _save_upload_part(self, upload_id: str, part_number: int, part_info: Dict):
+        """Record a single uploaded part in Redis or memory"""
         redis_client = self._get_redis()
         if redis_client:
-            redis_client.setex(
-                self._get_upload_key(upload_id),
-                MULTIPART_EXPIRE_SECONDS,
-                json.dumps(data)
-            )
+            parts_key = self._get_parts_key(upload_id)
+            # Replace any previous upload of the same part number atomically
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.zremrangebyscore(parts_key, part_number, part_number)
+            pipe.zadd(parts_key, {_dumps(part_info): part_number})
+            # An active upload stays alive: both keys expire after the last part
+            pipe.expire(parts_key, MULTIPART_EXPIRE_SECONDS)
+            pipe.expire(self._get_upload_key(upload_id), MULTIPART_EXPIRE_SECONDS)
+            pipe.execute()
         else:
-            if not hasattr(context, '_multipart_uploads'):
-                context._multipart_uploads = {}
-            context._multipart_uploads[upload_id] = data
+            _local_put_part(upload_id, part_number, part_info)
 
-    def _delete_upload_data(self, upload_id: str, part_count: int = 0):
-        """Delete upload metadata and parts from Redis or memory"""
+    def _delete_upload_data(self, upload_id: str):
+        """Delete upload metadata and part info from Redis or memory"""
         redis_client = self._get_redis()
         if redis_client:
-            # Delete upload metadata
-            redis_client.delete(self._get_upload_key(upload_id))
-            # Delete all parts
-            for i in range(1, part_count + 1):
-                redis_client.delete(self._get_part_key(upload_id, i))
+            redis_client.delete(
+                self._get_upload_key(upload_id),
+                self._get_parts_key(upload_id)
+            )
         else:
-            if hasattr(context, '_multipart_uploads'):
-                context._multipart_uploads.pop(upload_id, None)
-            if hasattr(context, '_multipart_parts'):
-                for i in range(1, part_count + 1):
-                    context._multipart_parts.pop(f"{upload_id}:{i}", None)
+            _local_pop(upload_id)
 
     def upload_part(self, bucket_name: str, key: str, upload_id: str, part_number: int) -> Response:
         """
@@ -232,30 +465,27 @@ class MultipartHandler:
                     status_code=400
                 )
 
-            # Get part data
-            part_data = request.get_data()
-            etag = self._calculate_etag(part_data)
-
-            # Store part data
-            redis_client = self._get_redis()
-            if redis_client:
-                redis_client.setex(
-                    self._get_part_key(upload_id, part_number),
-                    MULTIPART_EXPIRE_SECONDS,
-                    part_data
+            # Stream part data in chunks into a spool file (kept in memory
+            # for small parts), then hand it to storage as a native part
+            spool, part_size = spool_request_body(request)
+            with spool:
+                result = self.mc.s3_client.upload_part(
+                    Bucket=self.mc.format_bucket_name(bucket_name),
+                    Key=key,
+                    UploadId=upload_data['storage_upload_id'],
+                    PartNumber=part_number,
+                    Body=spool,
+                    ContentLength=part_size
                 )
-            else:
-                if not hasattr(context, '_multipart_parts'):
-                    context._multipart_parts = {}
-                context._multipart_parts[f"{upload_id}:{part_number}"] = part_data
 
-            # Update upload metadata with part info
-            upload_data['parts'][str(part_number)] = {
+            etag = self._normalize_etag(result['ETag'])
+
+            # Record part info
+            self._save_upload_part(upload_id, part_number, {
                 'etag': etag,
-                'size': len(part_data),
+                'size': part_size,
                 'last_modified': datetime.utcnow().isoformat()
-            }
-            self._save_upload_data(upload_id, upload_data)
+            })
 
             return upload_part_response(etag=etag)
 
@@ -290,7 +520,7 @@ class MultipartHandler:
                 )
 
             # Get upload metadata
-            upload_data = self._get_upload_data(upload_id)
+            upload_data = self._get_upload_data(upload_id, with_parts=True)
             if not upload_data:
                 return error_response(
                     code='NoSuchUpload',
@@ -310,21 +540,16 @@ class MultipartHandler:
             # Parse request body for part list
             body = request.get_data()
             try:
-                root = fromstring(body)
-                # Handle namespace
-                ns = {'s3': 'http://s3.amazonaws.com/doc/2006-03-01/'}
+                root = _parse_xml(body)
+                # '{*}' matches both namespaced and plain tags in a single pass
                 parts = []
-                for part in root.findall('.//Part', ns) or root.findall('.//Part'):
-                    part_num = part.find('PartNumber', ns)
-                    if part_num is None:
-                        part_num = part.find('PartNumber')
-                    etag = part.find('ETag', ns)
-                    if etag is None:
-                        etag = part.find('ETag')
+                for part in root.iterfind('.//{*}Part'):
+                    part_num = part.findtext('{*}PartNumber')
+                    etag = part.findtext('{*}ETag')
                     if part_num is not None and etag is not None:
                         parts.append({
-                            'part_number': int(part_num.text),
-                            'etag': etag.text.strip('"')
+                            'part_number': int(part_num),
+                            'etag': etag.strip('"')
                         })
             except Exception as e:
                 log.warning("Failed to parse CompleteMultipartUpload body: %s", e)
@@ -334,42 +559,62 @@ class MultipartHandler:
                     for k, v in upload_data['parts'].items()
                 ]
 
+            if not parts:
+                return error_response(
+                    code='MalformedXML',
+                    message='The XML you provided did not list any parts',
+                    resource=f'/{bucket_name}/{key}',
+                    status_code=400
+                )
+
             # Sort parts by part number
             parts.sort(key=lambda x: x['part_number'])
 
-            # Combine parts
-            combined_data = b''
-            redis_client = self._get_redis()
-
+            # Verify all parts were uploaded, with the ETags storage reported
             for part in parts:
-                part_number = part['part_number']
-
-                if redis_client:
-                    part_data = redis_client.get(
-                        self._get_part_key(upload_id, part_number)
-                    )
-                else:
-                    part_data = getattr(context, '_multipart_parts', {}).get(
-                        f"{upload_id}:{part_number}"
+                part_info = upload_data['parts'].get(str(part['part_number']))
+                if part_info is None:
+                    return error_response(
+                        code='InvalidPart',
+                        message=f'Part {part["part_number"]} not found',
+                        status_code=400
                     )
-
-                if not part_data:
+                if part_info['etag'].strip('"') != part['etag']:
                     return error_response(
                         code='InvalidPart',
-                        message=f'Part {part_number} not found',
+                        message=f'ETag of part {part["part_number"]} does not match',
                         status_code=400
                     )
 
-                combined_data += part_data
-
-            # Upload combined object
-            self.mc.upload_file(bucket_name, combined_data, key)
-
-            # Calculate final ETag (for multipart: hash of hashes + part count)
-            final_etag = f'"{hashlib.md5(combined_data).hexdigest()}-{len(parts)}"'
+            # Let storage assemble the object - no part data passes through here
+            try:
+                result = self.mc.s3_client.complete_multipart_upload(
+                    Bucket=self.mc.format_bucket_name(bucket_name),
+                    Key=key,
+                    UploadId=upload_data['storage_upload_id'],
+                    MultipartUpload={
+                        'Parts': [
+                            {'PartNumber': part['part_number'], 'ETag': f'"{part["etag"]}"'}
+                            for part in parts
+                        ]
+                    }
+                )
+            except ClientError as e:
+                error_code = get_error_code(e)
+                if error_code not in COMPLETE_CLIENT_ERROR_CODES:
+                    raise
+                # Keep the upload, so the client can fix the part list and retry
+                return error_response(
+                    code=error_code,
+                    message=e.response.get('Error', {}).get('Message') or str(e),
+                    resource=f'/{bucket_name}/{key}',
+                    status_code=400
+                )
+            final_etag = self._normalize_etag(result['ETag'])
+            forget_missing_object(self.mc, bucket_name, key)
 
             # Clean up multipart data
-            self._delete_upload_data(upload_id, len(parts))
+            self._delete_upload_data(upload_id)
 
             # Build location URL
             location = f"/{bucket_name}/{key}"
@@ -413,11 +658,11 @@ class MultipartHandler:
                     status_code=404
                 )
 
-            # Count parts for cleanup
-            part_count = len(upload_data.get('parts', {}))
+            # Discard uploaded parts in storage
+            _abort_storage_upload(self.mc, upload_data)
 
             # Clean up
-            self._delete_upload_data(upload_id, part_count)
+            self._delete_upload_data(upload_id)
 
             return delete_response()
 
@@ -444,7 +689,7 @@ class MultipartHandler:
                 )
 
             # Get upload metadata
-            upload_data = self._get_upload_data(upload_id)
+            upload_data = self._get_upload_data(upload_id, with_parts=True)
             if not upload_data:
                 return error_response(
                     code='NoSuchUpload',
@@ -454,17 +699,16 @@ class MultipartHandler:
                 )
 
             # Build parts list
-            parts = []
-            for part_num_str, part_info in upload_data.get('parts', {}).items():
-                parts.append({
+            now_iso = datetime.utcnow().isoformat()
+            parts = [
+                {
                     'part_number': int(part_num_str),
                     'etag': part_info['etag'],
                     'size': part_info['size'],
-                    'last_modified': part_info.get('last_modified', datetime.utcnow().isoformat())
-                })
-
-            # Sort by part number
-            parts.sort(key=lambda x: x['part_number'])
+                    'last_modified': part_info.get('last_modified') or now_iso
+                }
+                for part_num_str, part_info in upload_data['parts'].items()
+            ]
 
             return list_parts_response(
                 bucket=bucket_name,
@@ -16,14 +16,28 @@
 
 """ S3 Object Operations Handler """
 
+import bisect
 import hashlib
-import mimetypes
+import itertools
+from operator import itemgetter
 from datetime import datetime
+from botocore.exceptions import ClientError
 from flask import request, Response
 
 from pylon.core.tools import log
-from tools import MinioClient
 
+from ..utils import (
+    get_minio_client,
+    bucket_exists,
+    get_error_code,
+    spool_request_body,
+    stat_object,
+    format_http_date,
+    guess_content_type,
+    http_date_now,
+    forget_missing_object,
+    STREAM_CHUNK_SIZE
+)
 from ..responses import (
     list_objects_v2_response,
     put_object_response,
@@ -35,6 +49,17 @@ from ..responses import (
 )
 
 
+_by_name = itemgetter('name')
+
+
+def _iter_body(body, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Yield a storage response body in chunks, closing it when done"""
+    try:
+        yield from body.iter_chunks(chunk_size)
+    finally:
+        body.close()
+
+
 class ObjectHandler:
     """Handler for S3 object operations"""
 
@@ -46,18 +71,43 @@ class ObjectHandler:
             project: The project object for MinioClient
         """
         self.project = project
-        self.mc = MinioClient(project)
+        self.mc = get_minio_client(project)
 
     @staticmethod
-    def _calculate_etag(data: bytes) -> str:
-        """Calculate ETag (MD5 hash) for object"""
-        return f'"{hashlib.md5(data).hexdigest()}"'
+    def _calculate_etag(data) -> str:
+        """Calculate ETag (MD5 hash) for object bytes or a seekable file"""
+        if isinstance(data, (bytes, bytearray)):
+            return f'"{hashlib.md5(data, usedforsecurity=False).hexdigest()}"'
+        md5 = hashlib.md5(usedforsecurity=False)
+        data.seek(0)
+        for chunk in iter(lambda: data.read(STREAM_CHUNK_SIZE), b''):
+            md5.update(chunk)
+        return f'"{md5.hexdigest()}"'
+
+    def _upload(self, bucket_name: str, key: str, data, length: int = None) -> str:
+        """
+        Upload object data (bytes or a seekable file) and return its ETag.
+
+        Uses the ETag reported by storage, hashing locally only if it is missing.
+        """
+        params = {
+            'Bucket': self.mc.format_bucket_name(bucket_name),
+            'Key': key,
+            'Body': data
+        }
+        if length is not None:
+            params['ContentLength'] = length
+        result = self.mc.s3_client.put_object(**params)
+        forget_missing_object(self.mc, bucket_name, key)
+        etag = result.get('ETag')
+        if etag:
+            return f'"{etag.strip(chr(34))}"'
+        return self._calculate_etag(data)
 
     @staticmethod
     def _get_content_type(key: str) -> str:
         """Guess content type from key/filename"""
-        content_type, _ = mimetypes.guess_type(key)
-        return content_type or 'application/octet-stream'
+        return guess_content_type(key)
 
     def list_objects_v2(self, bucket_name: str) -> Response:
         """
@@ -74,8 +124,7 @@ class ObjectHandler:
         """
         try:
             # Check if bucket exists
-            existing_buckets = self.mc.list_bucket()
-            if bucket_name not in existing_buckets:
+            if not bucket_exists(self.mc, bucket_name):
                 return error_response(
                     code='NoSuchBucket',
                     message=f'Bucket {bucket_name} does not exist',
@@ -90,47 +139,40 @@ class ObjectHandler:
             continuation_token = request.args.get('continuation-token', '')
             start_after = request.args.get('start-after', '')
 
-            # List all files
-            all_files = self.mc.list_files(bucket_name)
-
-            # Filter by prefix
-            if prefix:
-                all_files = [f for f in all_files if f['name'].startswith(prefix)]
+            # List all files sorted by key - storage normally returns them in
+            # order already, which Timsort confirms in a single linear pass
+            all_files = sorted(self.mc.list_files(bucket_name), key=_by_name)
 
-            # Filter by start-after
-            if start_after:
-                all_files = [f for f in all_files if f['name'] > start_after]
+            # Keys must sort after both start-after and the continuation token
+            # (simple implementation - token is the last key)
+            lower_bound = max(start_after, continuation_token)
+            prefix_len = len(prefix)
 
-            # Handle continuation token (simple implementation - token is the last key)
-            if continuation_token:
-                all_files = [f for f in all_files if f['name'] > continuation_token]
-
-            # Sort by key name
-            all_files.sort(key=lambda x: x['name'])
-
-            # Handle delimiter (group common prefixes)
-            common_prefixes = []
-            filtered_files = []
-
-            if delimiter:
-                seen_prefixes = set()
-                for f in all_files:
-                    key = f['name']
-                    # Remove prefix from consideration
-                    suffix = key[len(prefix):] if prefix else key
-
-                    if delimiter in suffix:
-                        # This key has the delimiter - extract common prefix
-                        common_prefix = prefix + suffix.split(delimiter)[0] + delimiter
-                        if common_prefix not in seen_prefixes:
-                            seen_prefixes.add(common_prefix)
-                            common_prefixes.append(common_prefix)
-                    else:
-                        filtered_files.append(f)
+            # Jump to the first candidate key instead of scanning from the start
+            if lower_bound >= prefix:
+                start = bisect.bisect_right(all_files, lower_bound, key=_by_name)
             else:
-                filtered_files = all_files
+                start = bisect.bisect_left(all_files, prefix, key=_by_name)
 
-            # Apply max-keys limit
+            # Single pass over the matching key range: delimiter grouping
+            seen_prefixes = set()
+            filtered_files = []
+            for f in itertools.islice(all_files, start, None):
+                name = f['name']
+                if not name.startswith(prefix):
+                    break
+                if delimiter:
+                    # This key has the delimiter after the prefix - extract common prefix
+                    delimiter_pos = name.find(delimiter, prefix_len)
+                    if delimiter_pos != -1:
+                        seen_prefixes.add(name[:delimiter_pos + len(delimiter)])
+                        continue
+                filtered_files.append(f)
+
+            # Prefixes sort the same way as the keys they were taken from
+            common_prefixes = sorted(seen_prefixes)
+
+            # Apply max-keys limit (files are already in key order)
             is_truncated = len(filtered_files) > max_keys
             filtered_files = filtered_files[:max_keys]
 
@@ -168,8 +210,7 @@ class ObjectHandler:
         """
         try:
             # Check if bucket exists
-            existing_buckets = self.mc.list_bucket()
-            if bucket_name not in existing_buckets:
+            if not bucket_exists(self.mc, bucket_name):
                 return error_response(
                     code='NoSuchBucket',
                     message=f'Bucket {bucket_name} does not exist',
@@ -177,14 +218,15 @@ class ObjectHandler:
                     status_code=404
                 )
 
-            # Get request body
-            data = request.get_data()
-
-            # Upload the object
-            self.mc.upload_file(bucket_name, data, key)
+            # Empty objects (e.g. folder markers) need no body handling at all
+            if request.content_length == 0:
+                etag = self._upload(bucket_name, key, b'', 0)
+                return put_object_response(etag=etag)
 
-            # Calculate ETag
-            etag = self._calculate_etag(data)
+            # Stream request body into a spool file and upload it from there
+            body, body_size = spool_request_body(request)
+            with body:
+                etag = self._upload(bucket_name, key, body, body_size)
 
             return put_object_response(etag=etag)
 
@@ -205,8 +247,7 @@ class ObjectHandler:
         """
         try:
             # Check if bucket exists
-            existing_buckets = self.mc.list_bucket()
-            if bucket_name not in existing_buckets:
+            if not bucket_exists(self.mc, bucket_name):
                 return error_response(
                     code='NoSuchBucket',
                     message=f'Bucket {bucket_name} does not exist',
@@ -214,28 +255,33 @@ class ObjectHandler:
                     status_code=404
                 )
 
-            # Try to download the file
+            # Download the file - storage reports its stored ETag alongside the data
             try:
-                data = self.mc.download_file(bucket_name, key)
-            except Exception:
-                return error_response(
-                    code='NoSuchKey',
-                    message='The specified key does not exist',
-                    resource=f'/{bucket_name}/{key}',
-                    status_code=404
+                result = self.mc.s3_client.get_object(
+                    Bucket=self.mc.format_bucket_name(bucket_name),
+                    Key=key
                 )
-
-            # Calculate ETag
-            etag = self._calculate_etag(data)
+            except ClientError as e:
+                if get_error_code(e) in ('NoSuchKey', '404', 'NotFound'):
+                    return error_response(
+                        code='NoSuchKey',
+                        message='The specified key does not exist',
+                        resource=f'/{bucket_name}/{key}',
+                        status_code=404
+                    )
+                raise
 
             # Get content type
             content_type = self._get_content_type(key)
 
+            # Stream the body through in chunks instead of loading it into memory
+            last_modified = result.get('LastModified')
             return get_object_response(
-                body=data,
+                body=_iter_body(result['Body']),
                 content_type=content_type,
-                etag=etag,
-                last_modified=datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')
+                content_length=result.get('ContentLength', 0),
+                etag=result.get('ETag', ''),
+                last_modified=format_http_date(last_modified) if last_modified else http_date_now()
             )
 
         except Exception as e:
@@ -254,21 +300,24 @@ class ObjectHandler:
         S3 Operation: DELETE /{bucket}/{key}
         """
         try:
-            # Check if bucket exists
-            existing_buckets = self.mc.list_bucket()
-            if bucket_name not in existing_buckets:
-                return error_response(
-                    code='NoSuchBucket',
-                    message=f'Bucket {bucket_name} does not exist',
-                    resource=f'/{bucket_name}/{key}',
-                    status_code=404
-                )
-
-            # Try to delete the file (S3 returns 204 even if key doesn't exist)
+            # Delete the file directly - storage reports a missing bucket on the
+            # same call (S3 returns 204 even if key doesn't exist)
             try:
-                self.mc.remove_file(bucket_name, key)
-            except Exception:
-                pass  # S3 behavior: return success even if key doesn't exist
+                self.mc.s3_client.delete_object(
+                    Bucket=self.mc.format_bucket_name(bucket_name),
+                    Key=key
+                )
+            except ClientError as e:
+                error_code = get_error_code(e)
+                if error_code == 'NoSuchBucket':
+                    return error_response(
+                        code='NoSuchBucket',
+                        message=f'Bucket {bucket_name} does not exist',
+                        resource=f'/{bucket_name}/{key}',
+                        status_code=404
+                    )
+                if error_code not in ('NoSuchKey', '404', 'NotFound'):
+                    raise
 
             return delete_response()
 
@@ -289,8 +338,7 @@ class ObjectHandler:
         """
         try:
             # Check if bucket exists
-            existing_buckets = self.mc.list_bucket()
-            if bucket_name not in existing_buckets:
+            if not bucket_exists(self.mc, bucket_name):
                 return error_response(
                     code='NoSuchBucket',
                     message=f'Bucket {bucket_name} does not exist',
@@ -298,32 +346,25 @@ class ObjectHandler:
                     status_code=404
                 )
 
-            # Check if object exists and get size
-            file_size = self.mc.get_file_size(bucket_name, key)
-            if file_size == 0:
-                # Could be empty file or non-existent - check file list
-                files = self.mc.list_files(bucket_name)
-                file_exists = any(f['name'] == key for f in files)
-                if not file_exists:
-                    return error_response(
-                        code='NoSuchKey',
-                        message='The specified key does not exist',
-                        resource=f'/{bucket_name}/{key}',
-                        status_code=404
-                    )
+            # Get object metadata (existence, size, ETag) in one call
+            stat = stat_object(self.mc, bucket_name, key)
+            if stat is None:
+                return error_response(
+                    code='NoSuchKey',
+                    message='The specified key does not exist',
+                    resource=f'/{bucket_name}/{key}',
+                    status_code=404
+                )
 
             # Get content type
             content_type = self._get_content_type(key)
 
-            # For proper ETag, we'd need to read the file (expensive)
-            # Use placeholder based on size and key
-            etag = f'"{hashlib.md5((key + str(file_size)).encode()).hexdigest()}"'
-
+            last_modified = stat.get('LastModified')
             return head_response(
-                content_length=file_size,
+                content_length=stat.get('ContentLength', 0),
                 content_type=content_type,
-                etag=etag,
-                last_modified=datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')
+                etag=stat.get('ETag', ''),
+                last_modified=format_http_date(last_modified) if last_modified else http_date_now()
             )
 
         except Exception as e:
@@ -368,8 +409,7 @@ class ObjectHandler:
             source_bucket, source_key = parts
 
             # Check source bucket exists
-            existing_buckets = self.mc.list_bucket()
-            if source_bucket not in existing_buckets:
+            if not bucket_exists(self.mc, source_bucket):
                 return error_response(
                     code='NoSuchBucket',
                     message=f'Source bucket {source_bucket} does not exist',
@@ -377,19 +417,8 @@ class ObjectHandler:
                     status_code=404
                 )
 
-            # Download source object
-            try:
-                data = self.mc.download_file(source_bucket, source_key)
-            except Exception:
-                return error_response(
-                    code='NoSuchKey',
-                    message='Source key does not exist',
-                    resource=f'/{source_bucket}/{source_key}',
-                    status_code=404
-                )
-
             # Check destination bucket exists
-            if bucket_name not in existing_buckets:
+            if not bucket_exists(self.mc, bucket_name):
                 return error_response(
                     code='NoSuchBucket',
                     message=f'Destination bucket {bucket_name} does not exist',
@@ -397,12 +426,33 @@ class ObjectHandler:
                     status_code=404
                 )
 
-            # Upload to destination
-            self.mc.upload_file(bucket_name, data, key)
+            # Server-side copy - object data never passes through here
+            try:
+                result = self.mc.s3_client.copy_object(
+                    Bucket=self.mc.format_bucket_name(bucket_name),
+                    Key=key,
+                    CopySource={
+                        'Bucket': self.mc.format_bucket_name(source_bucket),
+                        'Key': source_key
+                    }
+                )
+            except ClientError as e:
+                if get_error_code(e) in ('NoSuchKey', '404'):
+                    return error_response(
+                        code='NoSuchKey',
+                        message='Source key does not exist',
+                        resource=f'/{source_bucket}/{source_key}',
+                        status_code=404
+                    )
+                raise
+            forget_missing_object(self.mc, bucket_name, key)
 
             # Return copy response
-            etag = self._calculate_etag(data)
-            return copy_object_response(etag=etag, last_modified=datetime.utcnow())
+            copy_result = result.get('CopyObjectResult', {})
+            return copy_object_response(
+                etag=copy_result.get('ETag', ''),
+                last_modified=copy_result.get('LastModified') or datetime.utcnow()
+            )
 
         except Exception as e:
             log.error("CopyObject failed: %s", e)
@@ -18,54 +18,165 @@
 
 import json
 from datetime import datetime
-from typing import List, Dict, Optional
-from xml.etree.ElementTree import Element, SubElement, tostring
-from flask import Response, request
+from functools import lru_cache
+from typing import List, Dict, Iterable, Iterator, Optional, Union
+from flask import Response, g, request
 
-
-S3_NAMESPACE = 'http://s3.amazonaws.com/doc/2006-03-01/'
+try:
+    import orjson  # pylint: disable=E0401
+except ImportError:
+    orjson = None
 
 
-def _create_root(tag: str) -> Element:
-    """Create root element with S3 namespace"""
-    return Element(tag, xmlns=S3_NAMESPACE)
+S3_NAMESPACE = 'http://s3.amazonaws.com/doc/2006-03-01/'
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8"?>\n'
+
+# Same escaping ElementTree applies to text nodes
+_XML_TEXT_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+# Error codes returned by the S3 handlers; their XML prefixes are built once
+ERROR_CODES = (
+    'AccessDenied',
+    'BucketAlreadyExists',
+    'BucketNotEmpty',
+    'EntityTooLarge',
+    'InternalError',
+    'InvalidArgument',
+    'InvalidPart',
+    'InvalidRequest',
+    'MethodNotAllowed',
+    'NoSuchBucket',
+    'NoSuchKey',
+    'NoSuchUpload',
+)
+
+_LOCATION_TEMPLATE = (
+    XML_DECLARATION +
+    b'<LocationConstraint xmlns="' + S3_NAMESPACE.encode() + b'">%b</LocationConstraint>'
+)
+
+
+_LIST_BUCKETS_PREFIX = (
+    XML_DECLARATION +
+    b'<ListAllMyBucketsResult xmlns="' + S3_NAMESPACE.encode() + b'"><Owner><ID>'
+)
+_BUCKET_TEMPLATE = b'<Bucket><Name>%b</Name><CreationDate>%b</CreationDate><Size>%b</Size>'
+_LIST_PARTS_PREFIX = (
+    XML_DECLARATION +
+    b'<ListPartsResult xmlns="' + S3_NAMESPACE.encode() + b'"><Bucket>%b</Bucket>'
+    b'<Key>%b</Key><UploadId>%b</UploadId><IsTruncated>%b</IsTruncated>'
+)
+_PART_TEMPLATE = (
+    b'<Part><PartNumber>%b</PartNumber><LastModified>%b</LastModified>'
+    b'<ETag>%b</ETag><Size>%b</Size></Part>'
+)
+_INITIATE_MULTIPART_TEMPLATE = (
+    XML_DECLARATION +
+    b'<InitiateMultipartUploadResult xmlns="' + S3_NAMESPACE.encode() + b'">'
+    b'<Bucket>%b</Bucket><Key>%b</Key><UploadId>%b</UploadId>'
+    b'</InitiateMultipartUploadResult>'
+)
+_COMPLETE_MULTIPART_TEMPLATE = (
+    XML_DECLARATION +
+    b'<CompleteMultipartUploadResult xmlns="' + S3_NAMESPACE.encode() + b'">'
+    b'<Location>%b</Location><Bucket>%b</Bucket><Key>%b</Key><ETag>%b</ETag>'
+    b'</CompleteMultipartUploadResult>'
+)
+_COPY_OBJECT_TEMPLATE = (
+    XML_DECLARATION +
+    b'<CopyObjectResult xmlns="' + S3_NAMESPACE.encode() + b'">'
+    b'<ETag>%b</ETag><LastModified>%b</LastModified></CopyObjectResult>'
+)
+# ListObjectsV2 XML is streamed in pieces of this many Contents entries
+LIST_XML_BATCH_SIZE = 256
+
+_LIST_OBJECTS_PREFIX = (
+    XML_DECLARATION +
+    b'<ListBucketResult xmlns="' + S3_NAMESPACE.encode() + b'"><IsTruncated>'
+)
+_CONTENTS_TEMPLATE = (
+    b'<Contents><Key>%b</Key><LastModified>%b</LastModified><ETag>%b</ETag>'
+    b'<Size>%d</Size><StorageClass>STANDARD</StorageClass></Contents>'
+)
+_LIST_OBJECTS_SUMMARY_TEMPLATE = (
+    b'<Name>%b</Name><Prefix>%b</Prefix><Delimiter>%b</Delimiter>'
+    b'<MaxKeys>%d</MaxKeys><KeyCount>%d</KeyCount>'
+)
+
+
+def _xml_text(value: str) -> bytes:
+    """Escape a string for use as XML text content"""
+    return value.translate(_XML_TEXT_ESCAPE).encode('utf-8')
+
+
+def _error_prefix(code: str) -> bytes:
+    """Build the fixed leading part of an Error document for a code"""
+    return XML_DECLARATION + b'<Error><Code>' + _xml_text(code) + b'</Code><Message>'
+
+
+_ERROR_PREFIXES = {code: _error_prefix(code) for code in ERROR_CODES}
+
+
+@lru_cache(maxsize=4096)
+def _format_datetime_str(dt: str) -> str:
+    """Format a string date in S3 format (listings repeat timestamps, so cached)"""
+    # Ensure string dates have proper format with Z suffix
+    # Input might be ISO format from filesystem: '2025-12-19T19:35:59.123456'
+    # AWS SDK requires RFC-3339 format: '2025-12-19T19:35:59.000Z'
+    if 'Z' in dt or '+' in dt:
+        return dt
+    # Strip microseconds if present and add Z suffix
+    dot = dt.find('.')
+    if dot != -1:
+        dt = dt[:dot]
+    return dt + '.000Z'
 
 
 def _format_datetime(dt: datetime) -> str:
     """Format datetime in S3 format (RFC-3339 / ISO 8601 with Z suffix)"""
     if isinstance(dt, str):
-        # Ensure string dates have proper format with Z suffix
-        # Input might be ISO format from filesystem: '2025-12-19T19:35:59.123456'
-        # AWS SDK requires RFC-3339 format: '2025-12-19T19:35:59.000Z'
-        if 'Z' not in dt and '+' not in dt:
-            # Strip microseconds if present and add Z suffix
-            if '.' in dt:
-                dt = dt.split('.')[0] + '.000Z'
-            else:
-                dt = dt + '.000Z'
-        return dt
-    return dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        return _format_datetime_str(dt)
+    return (
+        f'{dt.year:04d}-{dt.month:02d}-{dt.day:02d}'
+        f'T{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}.000Z'
+    )
+
+
+def _now() -> datetime:
+    """Current UTC time, taken once per request for fallback timestamps"""
+    now = getattr(g, 's3_now', None)
+    if now is None:
+        now = datetime.utcnow()
+        g.s3_now = now
+    return now
 
 
 def _get_output_format() -> str:
     """Get the requested output format from query parameter (xml or json)"""
-    return request.args.get('format', 'xml').lower()
+    output_format = getattr(g, 's3_output_format', None)
+    if output_format is None:
+        output_format = request.args.get('format', 'xml').lower()
+        g.s3_output_format = output_format
+    return output_format
 
 
-def _to_xml_response(root: Element, status_code: int = 200) -> Response:
-    """Convert Element to Flask Response with proper headers"""
-    xml_str = b'<?xml version="1.0" encoding="UTF-8"?>\n' + tostring(root, encoding='utf-8')
+def _to_xml_response(body, status_code: int = 200) -> Response:
+    """Wrap an XML document (bytes or iterable of bytes) in a Flask Response"""
     return Response(
-        xml_str,
+        body,
         status=status_code,
         mimetype='application/xml'
     )
 
 
 def _to_json_response(data: Dict, status_code: int = 200) -> Response:
-    """Convert dict to Flask JSON Response"""
+    """Convert dict to Flask JSON Response (orjson when available)"""
+    if orjson is not None:
+        body = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        body = json.dumps(data, indent=2)
     return Response(
-        json.dumps(data, indent=2),
+        body,
         status=status_code,
         mimetype='application/json'
     )
@@ -110,15 +221,21 @@ def error_response(code: str, message: str, resource: str = '',
         return _to_json_response(data, status_code)
 
     # Default to XML
-    root = Element('Error')
-    SubElement(root, 'Code').text = code
-    SubElement(root, 'Message').text = message
+    prefix = _ERROR_PREFIXES.get(code)
+    if prefix is None:
+        prefix = _error_prefix(code)
+    chunks = [prefix, _xml_text(message), b'</Message>']
     if resource:
-        SubElement(root, 'Resource').text = resource
+        chunks += (b'<Resource>', _xml_text(resource), b'</Resource>')
     if request_id:
-        SubElement(root, 'RequestId').text = request_id
+        chunks += (b'<RequestId>', _xml_text(request_id), b'</RequestId>')
+    chunks.append(b'</Error>')
 
-    return _to_xml_response(root, status_code)
+    return Response(
+        b''.join(chunks),
+        status=status_code,
+        mimetype='application/xml'
+    )
 
 
 def list_buckets_response(buckets: List[Dict], owner_id: str = '',
@@ -169,7 +286,7 @@ def list_buckets_response(buckets: List[Dict], owner_id: str = '',
             'buckets': []
         }
         for bucket in buckets:
-            creation_date = bucket.get('creation_date', datetime.utcnow())
+            creation_date = bucket.get('creation_date') or _now()
             bucket_data = {
                 'name': bucket['name'],
                 'creationDate': _format_datetime(creation_date),
@@ -181,25 +298,78 @@ def list_buckets_response(buckets: List[Dict], owner_id: str = '',
             data['buckets'].append(bucket_data)
         return _to_json_response(data)
 
-    # Default to XML
-    root = _create_root('ListAllMyBucketsResult')
-
-    owner = SubElement(root, 'Owner')
-    SubElement(owner, 'ID').text = owner_id
-    SubElement(owner, 'DisplayName').text = owner_display_name
-
-    buckets_elem = SubElement(root, 'Buckets')
+    # Default to XML - built from byte fragments, one Bucket entry per bucket
+    chunks = [
+        _LIST_BUCKETS_PREFIX,
+        _xml_text(owner_id),
+        b'</ID><DisplayName>',
+        _xml_text(owner_display_name),
+        b'</DisplayName></Owner><Buckets>'
+    ]
     for bucket in buckets:
-        bucket_elem = SubElement(buckets_elem, 'Bucket')
-        SubElement(bucket_elem, 'Name').text = bucket['name']
-        creation_date = bucket.get('creation_date', datetime.utcnow())
-        SubElement(bucket_elem, 'CreationDate').text = _format_datetime(creation_date)
-        SubElement(bucket_elem, 'Size').text = str(bucket.get('size', 0))
+        creation_date = bucket.get('creation_date') or _now()
+        chunks.append(_BUCKET_TEMPLATE % (
+            _xml_text(bucket['name']),
+            _xml_text(_format_datetime(creation_date)),
+            _xml_text(str(bucket.get('size', 0)))
+        ))
         retention_days = bucket.get('retention_days')
         if retention_days is not None:
-            SubElement(bucket_elem, 'RetentionDays').text = str(retention_days)
+            chunks.append(b'<RetentionDays>%b</RetentionDays>' % _xml_text(str(retention_days)))
+        chunks.append(b'</Bucket>')
+    chunks.append(b'</Buckets></ListAllMyBucketsResult>')
 
-    return _to_xml_response(root)
+    return _to_xml_response(b''.join(chunks))
+
+
+def _iter_list_objects_xml(bucket: str, objects: List[Dict], prefix: str,
+                           delimiter: str, max_keys: int, continuation_token: str,
+                           next_continuation_token: str, is_truncated: bool,
+                           common_prefixes: Optional[List[str]], now: str) -> Iterator[bytes]:
+    """
+    Yield a ListBucketResult document in batches of Contents entries.
+
+    Runs after the view returned when streamed, so the fallback timestamp
+    (now) is passed in already formatted.
+    """
+    chunks = [_LIST_OBJECTS_PREFIX, b'true' if is_truncated else b'false', b'</IsTruncated>']
+
+    for obj in objects:
+        name = obj['name']
+        modified = obj.get('modified')
+        modified = now if modified is None else _format_datetime(modified)
+        etag = obj.get('etag')
+        if etag is None:
+            etag = '"' + name + '"'
+        chunks.append(_CONTENTS_TEMPLATE % (
+            _xml_text(name),
+            _xml_text(modified),
+            _xml_text(etag),
+            obj.get('size', 0)
+        ))
+        if len(chunks) >= LIST_XML_BATCH_SIZE:
+            yield b''.join(chunks)
+            chunks = []
+
+    chunks.append(_LIST_OBJECTS_SUMMARY_TEMPLATE % (
+        _xml_text(bucket),
+        _xml_text(prefix),
+        _xml_text(delimiter),
+        max_keys,
+        len(objects)
+    ))
+
+    if continuation_token:
+        chunks.append(b'<ContinuationToken>%b</ContinuationToken>' % _xml_text(continuation_token))
+    if next_continuation_token:
+        chunks.append(b'<NextContinuationToken>%b</NextContinuationToken>' % _xml_text(next_continuation_token))
+
+    if common_prefixes:
+        for prefix_str in common_prefixes:
+            chunks.append(b'<CommonPrefixes><Prefix>%b</Prefix></CommonPrefixes>' % _xml_text(prefix_str))
+
+    chunks.append(b'</ListBucketResult>')
+    yield b''.join(chunks)
 
 
 def list_objects_v2_response(bucket: str, objects: List[Dict],
@@ -261,14 +431,17 @@ def list_objects_v2_response(bucket: str, objects: List[Dict],
             'contents': []
         }
 
-        for obj in objects:
-            data['contents'].append({
+        now = _format_datetime(_now())
+        data['contents'] = [
+            {
                 'key': obj['name'],
-                'lastModified': _format_datetime(obj.get('modified', datetime.utcnow())),
-                'etag': obj.get('etag', f'"{obj["name"]}"'),
+                'lastModified': now if obj.get('modified') is None else _format_datetime(obj['modified']),
+                'etag': '"' + obj['name'] + '"' if obj.get('etag') is None else obj['etag'],
                 'size': obj.get('size', 0),
                 'storageClass': 'STANDARD'
-            })
+            }
+            for obj in objects
+        ]
 
         if continuation_token:
             data['continuationToken'] = continuation_token
@@ -280,36 +453,16 @@ def list_objects_v2_response(bucket: str, objects: List[Dict],
 
         return _to_json_response(data)
 
-    # Default to XML
-    root = _create_root('ListBucketResult')
-
-    SubElement(root, 'IsTruncated').text = str(is_truncated).lower()
-
-    for obj in objects:
-        contents = SubElement(root, 'Contents')
-        SubElement(contents, 'Key').text = obj['name']
-        SubElement(contents, 'LastModified').text = _format_datetime(obj.get('modified', datetime.utcnow()))
-        SubElement(contents, 'ETag').text = obj.get('etag', f'"{obj["name"]}"')
-        SubElement(contents, 'Size').text = str(obj.get('size', 0))
-        SubElement(contents, 'StorageClass').text = 'STANDARD'
-
-    SubElement(root, 'Name').text = bucket
-    SubElement(root, 'Prefix').text = prefix
-    SubElement(root, 'Delimiter').text = delimiter
-    SubElement(root, 'MaxKeys').text = str(max_keys)
-    SubElement(root, 'KeyCount').text = str(len(objects))
-
-    if continuation_token:
-        SubElement(root, 'ContinuationToken').text = continuation_token
-    if next_continuation_token:
-        SubElement(root, 'NextContinuationToken').text = next_continuation_token
-
-    if common_prefixes:
-        for prefix_str in common_prefixes:
-            cp = SubElement(root, 'CommonPrefixes')
-            SubElement(cp, 'Prefix').text = prefix_str
-
-    return _to_xml_response(root)
+    # Default to XML - small listings are sent in one piece, large ones are
+    # streamed as they are built
+    xml_chunks = _iter_list_objects_xml(
+        bucket, objects, prefix, delimiter, max_keys, continuation_token,
+        next_continuation_token, is_truncated, common_prefixes,
+        _format_datetime(_now())
+    )
+    if len(objects) <= LIST_XML_BATCH_SIZE:
+        return _to_xml_response(b''.join(xml_chunks))
+    return _to_xml_response(xml_chunks)
 
 
 def create_bucket_response(location: str) -> Response:
@@ -319,29 +472,41 @@ def create_bucket_response(location: str) -> Response:
     Returns empty body with Location header.
     """
     return Response(
-        '',
+        b'',
         status=200,
         headers={'Location': location}
     )
 
 
-def delete_response() -> Response:
-    """Generate successful delete response (204 No Content)"""
-    return Response('', status=204)
+@lru_cache(maxsize=32)
+def _location_body(region: str) -> bytes:
+    """Render LocationConstraint body for a region (cached per region)"""
+    return _LOCATION_TEMPLATE % _xml_text(region)
 
 
-def head_response(content_length: int = 0, content_type: str = 'application/octet-stream',
-                  etag: str = '', last_modified: str = '',
-                  metadata: Dict = None) -> Response:
+def bucket_location_response(region: str) -> Response:
     """
-    Generate HEAD response with metadata headers.
+    Generate GetBucketLocation response.
+
+    XML Example:
+    <LocationConstraint>us-east-1</LocationConstraint>
     """
+    return _to_xml_response(_location_body(region))
+
+
+def delete_response() -> Response:
+    """Generate successful delete response (204 No Content)"""
+    return Response(b'', status=204)
+
+
+def _object_headers(content_type: str, content_length: int, etag: str,
+                    last_modified: str, metadata: Optional[Dict]) -> Dict:
+    """Build GetObject/HeadObject headers"""
     headers = {
-        'Content-Length': str(content_length),
         'Content-Type': content_type,
+        'Content-Length': str(content_length),
         'Accept-Ranges': 'bytes'
     }
-
     if etag:
         headers['ETag'] = etag
     if last_modified:
@@ -349,10 +514,19 @@ def head_response(content_length: int = 0, content_type: str = 'application/octe
 
     # Add custom metadata headers (x-amz-meta-*)
     if metadata:
-        for key, value in metadata.items():
-            headers[f'x-amz-meta-{key}'] = value
+        headers.update({f'x-amz-meta-{key}': value for key, value in metadata.items()})
+
+    return headers
 
-    return Response('', status=200, headers=headers)
+
+def head_response(content_length: int = 0, content_type: str = 'application/octet-stream',
+                  etag: str = '', last_modified: str = '',
+                  metadata: Dict = None) -> Response:
+    """
+    Generate HEAD response with metadata headers.
+    """
+    headers = _object_headers(content_type, content_length, etag, last_modified, metadata)
+    return Response(b'', status=200, headers=headers)
 
 
 def initiate_multipart_upload_response(bucket: str, key: str,
@@ -385,12 +559,11 @@ def initiate_multipart_upload_response(bucket: str, key: str,
         return _to_json_response(data)
 
     # Default to XML
-    root = _create_root('InitiateMultipartUploadResult')
-    SubElement(root, 'Bucket').text = bucket
-    SubElement(root, 'Key').text = key
-    SubElement(root, 'UploadId').text = upload_id
-
-    return _to_xml_response(root)
+    return _to_xml_response(_INITIATE_MULTIPART_TEMPLATE % (
+        _xml_text(bucket),
+        _xml_text(key),
+        _xml_text(upload_id)
+    ))
 
 
 def upload_part_response(etag: str) -> Response:
@@ -400,7 +573,7 @@ def upload_part_response(etag: str) -> Response:
     Returns ETag in header.
     """
     return Response(
-        '',
+        b'',
         status=200,
         headers={'ETag': etag}
     )
@@ -439,13 +612,12 @@ def complete_multipart_upload_response(bucket: str, key: str,
         return _to_json_response(data)
 
     # Default to XML
-    root = _create_root('CompleteMultipartUploadResult')
-    SubElement(root, 'Location').text = location
-    SubElement(root, 'Bucket').text = bucket
-    SubElement(root, 'Key').text = key
-    SubElement(root, 'ETag').text = etag
-
-    return _to_xml_response(root)
+    return _to_xml_response(_COMPLETE_MULTIPART_TEMPLATE % (
+        _xml_text(location),
+        _xml_text(bucket),
+        _xml_text(key),
+        _xml_text(etag)
+    ))
 
 
 def list_parts_response(bucket: str, key: str, upload_id: str,
@@ -495,43 +667,47 @@ def list_parts_response(bucket: str, key: str, upload_id: str,
             'key': key,
             'uploadId': upload_id,
             'isTruncated': is_truncated,
-            'maxParts': max_parts,
-            'parts': []
+            'maxParts': max_parts
         }
 
-        for part in parts:
-            data['parts'].append({
+        now = _now()
+        data['parts'] = [
+            {
                 'partNumber': part['part_number'],
-                'lastModified': _format_datetime(part.get('last_modified', datetime.utcnow())),
+                'lastModified': _format_datetime(part.get('last_modified', now)),
                 'etag': part['etag'],
                 'size': part['size']
-            })
+            }
+            for part in parts
+        ]
 
         if next_part_number_marker:
             data['nextPartNumberMarker'] = next_part_number_marker
 
         return _to_json_response(data)
 
-    # Default to XML
-    root = _create_root('ListPartsResult')
-    SubElement(root, 'Bucket').text = bucket
-    SubElement(root, 'Key').text = key
-    SubElement(root, 'UploadId').text = upload_id
-    SubElement(root, 'IsTruncated').text = str(is_truncated).lower()
+    # Default to XML - built from byte templates, one Part entry per part
+    chunks = [_LIST_PARTS_PREFIX % (
+        _xml_text(bucket),
+        _xml_text(key),
+        _xml_text(upload_id),
+        b'true' if is_truncated else b'false'
+    )]
 
     for part in parts:
-        part_elem = SubElement(root, 'Part')
-        SubElement(part_elem, 'PartNumber').text = str(part['part_number'])
-        SubElement(part_elem, 'LastModified').text = _format_datetime(part.get('last_modified', datetime.utcnow()))
-        SubElement(part_elem, 'ETag').text = part['etag']
-        SubElement(part_elem, 'Size').text = str(part['size'])
+        chunks.append(_PART_TEMPLATE % (
+            _xml_text(str(part['part_number'])),
+            _xml_text(_format_datetime(part.get('last_modified') or _now())),
+            _xml_text(part['etag']),
+            _xml_text(str(part['size']))
+        ))
 
     if next_part_number_marker:
-        SubElement(root, 'NextPartNumberMarker').text = str(next_part_number_marker)
+        chunks.append(b'<NextPartNumberMarker>%b</NextPartNumberMarker>' % _xml_text(str(next_part_number_marker)))
 
-    SubElement(root, 'MaxParts').text = str(max_parts)
+    chunks.append(b'<MaxParts>%b</MaxParts></ListPartsResult>' % _xml_text(str(max_parts)))
 
-    return _to_xml_response(root)
+    return _to_xml_response(b''.join(chunks))
 
 
 def copy_object_response(etag: str, last_modified: datetime) -> Response:
@@ -560,11 +736,10 @@ def copy_object_response(etag: str, last_modified: datetime) -> Response:
         return _to_json_response(data)
 
     # Default to XML
-    root = _create_root('CopyObjectResult')
-    SubElement(root, 'ETag').text = etag
-    SubElement(root, 'LastModified').text = _format_datetime(last_modified)
-
-    return _to_xml_response(root)
+    return _to_xml_response(_COPY_OBJECT_TEMPLATE % (
+        _xml_text(etag),
+        _xml_text(_format_datetime(last_modified))
+    ))
 
 
 def put_object_response(etag: str, version_id: str = '') -> Response:
@@ -577,32 +752,22 @@ def put_object_response(etag: str, version_id: str = '') -> Response:
     if version_id:
         headers['x-amz-version-id'] = version_id
 
-    return Response('', status=200, headers=headers)
+    return Response(b'', status=200, headers=headers)
 
 
-def get_object_response(body: bytes, content_type: str = 'application/octet-stream',
+def get_object_response(body: Union[bytes, Iterable[bytes]],
+                        content_type: str = 'application/octet-stream',
                         content_length: int = None, etag: str = '',
                         last_modified: str = '', metadata: Dict = None) -> Response:
     """
     Generate GetObject response with body and headers.
+
+    The body may be bytes or an iterable of byte chunks, which is streamed as is
+    (content_length is required then).
     """
+    streamed = not isinstance(body, (bytes, bytearray))
     if content_length is None:
         content_length = len(body)
 
-    headers = {
-        'Content-Type': content_type,
-        'Content-Length': str(content_length),
-        'Accept-Ranges': 'bytes'
-    }
-
-    if etag:
-        headers['ETag'] = etag
-    if last_modified:
-        headers['Last-Modified'] = last_modified
-
-    # Add custom metadata headers
-    if metadata:
-        for key, value in metadata.items():
-            headers[f'x-amz-meta-{key}'] = value
-
-    return Response(body, status=200, headers=headers)
+    headers = _object_headers(content_type, content_length, etag, last_modified, metadata)
+    return Response(body, status=200, headers=headers, direct_passthrough=streamed)
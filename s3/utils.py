@@ -17,8 +17,69 @@
 """ S3 API Utility Functions """
 
 import mimetypes
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime
+from email.utils import formatdate
+from typing import Optional
 from urllib.parse import unquote
 
+import flask
+from botocore.exceptions import ClientError
+from tools import MinioClient
+
+
+# Size of chunks read from the request body stream
+STREAM_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+# Request bodies larger than this are spooled to disk before being sent to storage
+SPOOL_MAX_SIZE = 8 * 1024 * 1024  # 8 MiB
+
+# How long a project's bucket list is reused before asking storage again
+BUCKET_LIST_CACHE_TTL = 2.0  # seconds
+
+_bucket_list_cache = {}
+_bucket_list_cache_lock = threading.Lock()
+
+# How long a project's storage client (and its warm connection pool) is reused
+MINIO_CLIENT_CACHE_TTL = 300.0  # seconds
+
+_minio_clients = {}
+_minio_clients_lock = threading.Lock()
+
+# How long an object reported missing by storage is answered as missing locally
+MISSING_OBJECT_CACHE_TTL = 10.0  # seconds
+MISSING_OBJECT_CACHE_SIZE = 4096
+
+# (storage bucket, key) -> time the miss was seen
+_missing_objects = {}
+_missing_objects_lock = threading.Lock()
+
+# Private mimetypes database - mimetypes.init() would rebuild the process-wide
+# one and drop types other plugins registered with add_type()
+_MIME_TYPES = mimetypes.MimeTypes(
+    filenames=[path for path in mimetypes.knownfiles if os.path.isfile(path)]
+)
+# Extension -> content type, loaded once
+_CONTENT_TYPES = dict(_MIME_TYPES.types_map[True])
+# Suffixes that change the meaning of the one before them (.tgz, .gz, ...), lowercased
+_COMPOUND_SUFFIXES = frozenset(
+    suffix.lower() for suffix in (*_MIME_TYPES.suffix_map, *_MIME_TYPES.encodings_map)
+)
+
+# Bucket name rules, compiled once
+_BUCKET_NAME_RE = re.compile(r'[a-z0-9](?:[a-z0-9-]*[a-z0-9])?')
+_BUCKET_NAME_EDGE_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
+_IP_ADDRESS_RE = re.compile(r'\d+\.\d+\.\d+\.\d+')
+
+# Control characters not allowed in object keys (tab, LF and CR are)
+_INVALID_KEY_CHAR_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Current HTTP date, re-formatted at most once per second: [epoch second, formatted]
+_http_date_now = [0, '']
+
 
 def parse_bucket_and_key(path: str) -> tuple:
     """
@@ -40,14 +101,180 @@ def parse_bucket_and_key(path: str) -> tuple:
     return bucket, key
 
 
+def iter_request_body(flask_request, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Iterate over the request body in chunks without buffering it whole.
+
+    If the body was already read whole (flask.g.s3_body_consumed is set by
+    callers of get_data(), e.g. SigV4 payload hashing), the cached data is
+    yielded in chunks instead.
+    """
+    if flask.g.get('s3_body_consumed'):
+        cached = flask_request.get_data()
+        for offset in range(0, len(cached), chunk_size):
+            yield cached[offset:offset + chunk_size]
+        return
+
+    stream = flask_request.stream
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def spool_request_body(flask_request, max_size: int = SPOOL_MAX_SIZE) -> tuple:
+    """
+    Copy the request body into a spooled temporary file.
+
+    The body is kept in memory up to max_size bytes and spills to disk
+    beyond that, so storage gets a seekable body of known length.
+
+    Returns: (file positioned at start, body size) - caller closes the file
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_size)
+    body_size = 0
+    for chunk in iter_request_body(flask_request):
+        spool.write(chunk)
+        body_size += len(chunk)
+    spool.seek(0)
+    return spool, body_size
+
+
+def get_minio_client(project, **client_kwargs) -> MinioClient:
+    """
+    MinioClient for the project, shared between requests.
+
+    Clients are kept per project and client_kwargs (e.g. configuration_title)
+    for MINIO_CLIENT_CACHE_TTL seconds, so the storage connection pool stays
+    warm while configuration changes still get picked up.
+    """
+    project_id = getattr(project, 'id', None)
+    if project_id is None:
+        return MinioClient(project, **client_kwargs)
+
+    cache_key = (project_id, tuple(sorted(client_kwargs.items())))
+    now = time.monotonic()
+    with _minio_clients_lock:
+        entry = _minio_clients.get(cache_key)
+    if entry and now - entry[0] < MINIO_CLIENT_CACHE_TTL:
+        return entry[1]
+
+    client = MinioClient(project, **client_kwargs)
+    with _minio_clients_lock:
+        # Drop clients nobody asked for within the TTL, so projects that went
+        # idle do not keep their connection pools around
+        for key in [key for key, (created, _) in _minio_clients.items()
+                    if now - created >= MINIO_CLIENT_CACHE_TTL]:
+            del _minio_clients[key]
+        _minio_clients[cache_key] = (now, client)
+    return client
+
+
+def invalidate_minio_clients(project_id: int):
+    """Drop cached clients of the project - call when its storage configuration changes"""
+    with _minio_clients_lock:
+        for key in [key for key in _minio_clients if key[0] == project_id]:
+            del _minio_clients[key]
+
+
+def list_bucket_cached(mc, refresh: bool = False) -> tuple:
+    """
+    Cached MinioClient.list_bucket().
+
+    Bucket lists are kept per project bucket prefix for BUCKET_LIST_CACHE_TTL
+    seconds. Pass refresh=True to bypass (and repopulate) the cache.
+    """
+    cache_key = mc.format_bucket_name('')
+    now = time.monotonic()
+
+    if not refresh:
+        with _bucket_list_cache_lock:
+            entry = _bucket_list_cache.get(cache_key)
+        if entry and now - entry[0] < BUCKET_LIST_CACHE_TTL:
+            return entry[1]
+
+    buckets = tuple(mc.list_bucket())
+    with _bucket_list_cache_lock:
+        _bucket_list_cache[cache_key] = (now, buckets, frozenset(buckets))
+    return buckets
+
+
+def bucket_exists(mc, bucket: str) -> bool:
+    """
+    Check bucket existence against the cached bucket list.
+
+    A miss is re-checked with a fresh listing, so buckets created elsewhere
+    are found immediately; only hits are served purely from cache.
+    """
+    cache_key = mc.format_bucket_name('')
+    with _bucket_list_cache_lock:
+        entry = _bucket_list_cache.get(cache_key)
+    if entry and time.monotonic() - entry[0] < BUCKET_LIST_CACHE_TTL and bucket in entry[2]:
+        return True
+    return bucket in list_bucket_cached(mc, refresh=True)
+
+
+def invalidate_bucket_list_cache(mc):
+    """Drop the cached bucket list for the client's project"""
+    with _bucket_list_cache_lock:
+        _bucket_list_cache.pop(mc.format_bucket_name(''), None)
+
+
+def is_object_known_missing(mc, bucket: str, key: str) -> bool:
+    """Check whether storage reported the object missing within MISSING_OBJECT_CACHE_TTL"""
+    with _missing_objects_lock:
+        missed_at = _missing_objects.get((mc.format_bucket_name(bucket), key))
+    return missed_at is not None and time.monotonic() - missed_at < MISSING_OBJECT_CACHE_TTL
+
+
+def remember_missing_object(mc, bucket: str, key: str):
+    """Record that storage reported the object missing"""
+    with _missing_objects_lock:
+        if len(_missing_objects) >= MISSING_OBJECT_CACHE_SIZE:
+            _missing_objects.clear()
+        _missing_objects[(mc.format_bucket_name(bucket), key)] = time.monotonic()
+
+
+def forget_missing_object(mc, bucket: str, key: str):
+    """Drop a recorded miss - call whenever the object is written"""
+    with _missing_objects_lock:
+        _missing_objects.pop((mc.format_bucket_name(bucket), key), None)
+
+
+def get_error_code(error: ClientError) -> str:
+    """Get the S3 error code from a botocore ClientError"""
+    return error.response.get('Error', {}).get('Code', '')
+
+
+def stat_object(mc, bucket: str, key: str) -> Optional[dict]:
+    """
+    Get object metadata with a single HeadObject call.
+
+    Returns: HeadObject response, or None if the object does not exist
+    """
+    try:
+        return mc.s3_client.head_object(Bucket=mc.format_bucket_name(bucket), Key=key)
+    except ClientError as e:
+        if get_error_code(e) in ('404', 'NoSuchKey', 'NotFound'):
+            return None
+        raise
+
+
 def guess_content_type(filename: str) -> str:
     """
     Guess the content type from filename.
 
     Returns application/octet-stream if unknown.
     """
-    content_type, _ = mimetypes.guess_type(filename)
-    return content_type or 'application/octet-stream'
+    dot = filename.rfind('.')
+    if dot == -1:
+        return 'application/octet-stream'
+    suffix = filename[dot:].lower()
+    if suffix in _COMPOUND_SUFFIXES:
+        # Rare compound names (x.tar.gz, x.tgz) take the full mimetypes path
+        return _MIME_TYPES.guess_type(filename)[0] or 'application/octet-stream'
+    return _CONTENT_TYPES.get(suffix, 'application/octet-stream')
 
 
 def format_http_date(dt) -> str:
@@ -56,7 +283,6 @@ def format_http_date(dt) -> str:
 
     Example: Wed, 21 Oct 2015 07:28:00 GMT
     """
-    from datetime import datetime
     if isinstance(dt, str):
         try:
             dt = datetime.fromisoformat(dt.replace('Z', '+00:00'))
@@ -65,26 +291,37 @@ def format_http_date(dt) -> str:
     return dt.strftime('%a, %d %b %Y %H:%M:%S GMT')
 
 
+def http_date_now() -> str:
+    """
+    Current time as HTTP date (RFC 7231).
+
+    The formatted value is reused for the rest of the current second.
+    """
+    now = int(time.time())
+    cached = _http_date_now
+    if cached[0] != now:
+        cached[1] = formatdate(now, usegmt=True)
+        cached[0] = now
+    return cached[1]
+
+
 def validate_bucket_name(name: str) -> tuple:
     """
     Validate S3 bucket name according to AWS rules.
 
     Returns: (is_valid, error_message)
     """
-    import re
-
     if not name:
         return False, "Bucket name cannot be empty"
 
     if len(name) < 3 or len(name) > 63:
         return False, "Bucket name must be between 3 and 63 characters"
 
-    # Must start and end with letter or number
-    if not re.match(r'^[a-z0-9]', name) or not re.match(r'.*[a-z0-9]$', name):
-        return False, "Bucket name must start and end with a letter or number"
-
-    # Only lowercase letters, numbers, and hyphens
-    if not re.match(r'^[a-z0-9-]+$', name):
+    # Lowercase letters, numbers and hyphens, starting and ending with a
+    # letter or number - one match; the failing rule is only worked out on error
+    if not _BUCKET_NAME_RE.fullmatch(name):
+        if name[0] not in _BUCKET_NAME_EDGE_CHARS or name[-1] not in _BUCKET_NAME_EDGE_CHARS:
+            return False, "Bucket name must start and end with a letter or number"
         return False, "Bucket name can only contain lowercase letters, numbers, and hyphens"
 
     # Cannot have consecutive hyphens
@@ -92,7 +329,7 @@ def validate_bucket_name(name: str) -> tuple:
         return False, "Bucket name cannot have consecutive hyphens"
 
     # Cannot be formatted as IP address
-    if re.match(r'^\d+\.\d+\.\d+\.\d+$', name):
+    if _IP_ADDRESS_RE.fullmatch(name):
         return False, "Bucket name cannot be formatted as IP address"
 
     return True, None
@@ -111,9 +348,9 @@ def validate_object_key(key: str) -> tuple:
         return False, "Object key cannot exceed 1024 characters"
 
     # Check for invalid characters (control characters except certain ones)
-    for char in key:
-        if ord(char) < 32 and char not in '\t\n\r':
-            return False, f"Object key contains invalid character: {repr(char)}"
+    invalid = _INVALID_KEY_CHAR_RE.search(key)
+    if invalid:
+        return False, f"Object key contains invalid character: {repr(invalid.group())}"
 
     return True, None
 
@@ -134,12 +371,13 @@ def get_part_range(range_header: str, total_size: int) -> tuple:
 
     try:
         range_spec = range_header[6:]  # Remove 'bytes='
-        parts = range_spec.split('-')
+        dash = range_spec.find('-')
 
-        if len(parts) != 2:
+        if dash == -1 or range_spec.find('-', dash + 1) != -1:
             return None, None
 
-        start_str, end_str = parts
+        start_str = range_spec[:dash]
+        end_str = range_spec[dash + 1:]
 
         if start_str == '':
             # Suffix range: -500 means last 500 bytes
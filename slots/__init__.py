@@ -0,0 +1,20 @@
+""" Slots """
+
+# Rendered slot templates, keyed by (descriptor, template name)
+_rendered_templates = {}
+
+
+def render_template_cached(context, descriptor, template_name: str) -> str:
+    """
+    Render a payload-independent slot template once and reuse the result.
+
+    Slot templates only depend on static asset URLs, so the first render
+    serves every later call (a module reload starts with a fresh cache).
+    """
+    key = (descriptor, template_name)
+    rendered = _rendered_templates.get(key)
+    if rendered is None:
+        with context.app.app_context():
+            rendered = descriptor.render_template(template_name)
+        _rendered_templates[key] = rendered
+    return rendered
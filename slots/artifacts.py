@@ -1,35 +1,25 @@
-from pylon.core.tools import web  # pylint: disable=E0611,E0401
+from pylon.core.tools import web, log  # pylint: disable=E0611,E0401
 from tools import auth, theme  # pylint: disable=E0401
 
+from . import render_template_cached
+
 
 class Slot:  # pylint: disable=E1101,R0903
     @web.slot('artifacts_content')
     @auth.decorators.check_slot(["configuration.artifacts"], 
                                 access_denied_reply=theme.access_denied_part)
     def content(self, context, slot, payload):
-        from pylon.core.tools import log
-        log.info('slot: [%s], payload: %s', slot, payload)
-        with context.app.app_context():
-            return self.descriptor.render_template(
-                'artifacts/content.html'
-            )
+        log.debug('slot: [%s], payload: %s', slot, payload)
+        return render_template_cached(context, self.descriptor, 'artifacts/content.html')
 
     @web.slot('artifacts_scripts')
     @auth.decorators.check_slot(["configuration.artifacts"])
     def scripts(self, context, slot, payload):
-        from pylon.core.tools import log
-        log.info('slot: [%s], payload: %s', slot, payload)
-        with context.app.app_context():
-            return self.descriptor.render_template(
-                'artifacts/scripts.html',
-            )
+        log.debug('slot: [%s], payload: %s', slot, payload)
+        return render_template_cached(context, self.descriptor, 'artifacts/scripts.html')
 
     @web.slot('artifacts_styles')
     @auth.decorators.check_slot(["configuration.artifacts"])
     def styles(self, context, slot, payload):
-        from pylon.core.tools import log
-        log.info('slot: [%s], payload: %s', slot, payload)
-        with context.app.app_context():
-            return self.descriptor.render_template(
-                'artifacts/styles.html',
-            )
+        log.debug('slot: [%s], payload: %s', slot, payload)
+        return render_template_cached(context, self.descriptor, 'artifacts/styles.html')
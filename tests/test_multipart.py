@@ -0,0 +1,122 @@
+""" CompleteMultipartUpload error handling """
+
+from unittest import mock
+
+import pytest
+
+flask = pytest.importorskip('flask')
+pytest.importorskip('botocore')
+pytest.importorskip('pylon')
+pytest.importorskip('tools')
+
+from botocore.exceptions import ClientError  # pylint: disable=C0413
+
+from s3.handlers import multipart  # pylint: disable=C0413
+
+
+UPLOAD_ID = 'upload1'
+PART_ETAGS = {1: 'etag-one', 2: 'etag-two'}
+
+
+def _complete_body(parts) -> bytes:
+    items = ''.join(
+        f'<Part><PartNumber>{number}</PartNumber><ETag>"{etag}"</ETag></Part>'
+        for number, etag in parts
+    )
+    return f'<CompleteMultipartUpload>{items}</CompleteMultipartUpload>'.encode()
+
+
+@pytest.fixture
+def mc():
+    client = mock.MagicMock()
+    client.format_bucket_name.side_effect = lambda bucket: f'p1-{bucket}'
+    client.s3_client.complete_multipart_upload.return_value = {'ETag': '"final"'}
+    return client
+
+
+@pytest.fixture
+def handler(mc, monkeypatch):
+    monkeypatch.setattr(multipart, 'get_minio_client', lambda project: mc)
+    monkeypatch.setattr(multipart.MultipartHandler, '_get_redis', staticmethod(lambda: None))
+    monkeypatch.setattr(multipart, '_local_uploads', {})
+    multipart._local_put(mc, UPLOAD_ID, {  # pylint: disable=W0212
+        'bucket': 'bucket',
+        'key': 'key',
+        'storage_upload_id': 'storage1',
+        'parts': {
+            str(number): {'etag': f'"{etag}"', 'size': 1}
+            for number, etag in PART_ETAGS.items()
+        }
+    })
+    return multipart.MultipartHandler(project=None)
+
+
+def _complete(handler, body: bytes):
+    app = flask.Flask(__name__)
+    with app.test_request_context('/bucket/key', method='POST', data=body):
+        return handler.complete_multipart_upload('bucket', 'key', UPLOAD_ID)
+
+
+def _upload_exists() -> bool:
+    return multipart._local_get(UPLOAD_ID) is not None  # pylint: disable=W0212
+
+
+def test_complete_success(handler, mc):
+    response = _complete(handler, _complete_body(PART_ETAGS.items()))
+
+    assert response.status_code == 200
+    mc.s3_client.complete_multipart_upload.assert_called_once()
+    assert not _upload_exists()
+
+
+def test_complete_etag_mismatch_is_invalid_part(handler, mc):
+    response = _complete(handler, _complete_body([(1, 'etag-one'), (2, 'wrong')]))
+
+    assert response.status_code == 400
+    assert b'<Code>InvalidPart</Code>' in response.get_data()
+    mc.s3_client.complete_multipart_upload.assert_not_called()
+    assert _upload_exists()
+
+
+def test_complete_unknown_part_is_invalid_part(handler, mc):
+    response = _complete(handler, _complete_body([(3, 'etag-three')]))
+
+    assert response.status_code == 400
+    assert b'<Code>InvalidPart</Code>' in response.get_data()
+    mc.s3_client.complete_multipart_upload.assert_not_called()
+
+
+def test_complete_without_parts_is_malformed_xml(handler, mc):
+    response = _complete(handler, _complete_body([]))
+
+    assert response.status_code == 400
+    assert b'<Code>MalformedXML</Code>' in response.get_data()
+    mc.s3_client.complete_multipart_upload.assert_not_called()
+    assert _upload_exists()
+
+
+@pytest.mark.parametrize('error_code', multipart.COMPLETE_CLIENT_ERROR_CODES)
+def test_complete_storage_rejection_is_passed_through(handler, mc, error_code):
+    mc.s3_client.complete_multipart_upload.side_effect = ClientError(
+        {'Error': {'Code': error_code, 'Message': 'rejected by storage'}},
+        'CompleteMultipartUpload'
+    )
+
+    response = _complete(handler, _complete_body(PART_ETAGS.items()))
+
+    assert response.status_code == 400
+    assert f'<Code>{error_code}</Code>'.encode() in response.get_data()
+    assert b'rejected by storage' in response.get_data()
+    assert _upload_exists()
+
+
+def test_complete_storage_failure_is_internal_error(handler, mc):
+    mc.s3_client.complete_multipart_upload.side_effect = ClientError(
+        {'Error': {'Code': 'InternalError', 'Message': 'storage down'}},
+        'CompleteMultipartUpload'
+    )
+
+    response = _complete(handler, _complete_body(PART_ETAGS.items()))
+
+    assert response.status_code == 500
+    assert _upload_exists()
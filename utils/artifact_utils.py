@@ -1,10 +1,18 @@
 """Utility functions for artifact ID handling."""
 import base64
-import re
-from typing import Optional
+import binascii
+from functools import lru_cache
+from typing import NamedTuple, Optional, Union
 
+from botocore.exceptions import ClientError
 from pylon.core.tools import log
-from tools import MinioClient
+
+from ..s3.utils import (
+    get_minio_client,
+    get_error_code,
+    is_object_known_missing,
+    remember_missing_object
+)
 
 
 class InvalidArtifactIdError(ValueError):
@@ -12,7 +20,13 @@ class InvalidArtifactIdError(ValueError):
     pass
 
 
-def extract_path_from_artifact_id(artifact_id: str) -> tuple[str, str]:
+class ParsedArtifact(NamedTuple):
+    """Storage location of an artifact (unpacks as (bucket_name, filename))."""
+    bucket_name: str
+    filename: str
+
+
+def extract_path_from_artifact_id(artifact_id: str) -> ParsedArtifact:
     """
     Extract bucket name and filename from artifact_id.
     
@@ -20,38 +34,51 @@ def extract_path_from_artifact_id(artifact_id: str) -> tuple[str, str]:
     Example: img_mybucket_1703001234_a1b2c3d4_png
     
     Returns:
-        tuple: (bucket_name, filename)
+        ParsedArtifact: (bucket_name, filename)
         Example: ('mybucket', 'img_mybucket_1703001234_a1b2c3d4.png')
     
     Raises:
         InvalidArtifactIdError: If artifact_id has invalid pattern
     """
-    parts = artifact_id.split('_')
+    parsed = _parse_artifact_id(artifact_id)
+    if isinstance(parsed, str):
+        raise InvalidArtifactIdError(parsed)
+    return parsed
+
+
+@lru_cache(maxsize=4096)
+def _parse_artifact_id(artifact_id: str) -> Union[ParsedArtifact, str]:
+    """
+    Cached parse behind extract_path_from_artifact_id.
     
-    # Must have at least 5 parts: type_bucket_timestamp_uuid_ext
-    if len(parts) < 5:
-        raise InvalidArtifactIdError(
-            f"Invalid artifact_id pattern: must have at least 5 parts separated by underscore"
-        )
+    Returns the ParsedArtifact, or the error message for an invalid
+    artifact_id - exceptions are not cached, so errors are returned instead.
+    """
+    # Locate the separators instead of splitting: first one ends the type,
+    # the last three precede timestamp, uuid and extension
+    type_end = artifact_id.find('_')
+    ext_start = artifact_id.rfind('_')
+    uuid_start = artifact_id.rfind('_', 0, ext_start)
+    timestamp_start = artifact_id.rfind('_', 0, uuid_start)
     
-    ext = parts[-1]  # Last part is extension
+    # Must have at least 5 parts: type_bucket_timestamp_uuid_ext
+    if uuid_start == -1 or timestamp_start <= type_end:
+        return "Invalid artifact_id pattern: must have at least 5 parts separated by underscore"
     
     # Bucket is everything between type and last three parts (timestamp_uuid_ext)
-    bucket_name = '_'.join(parts[1:-3])
+    bucket_name = artifact_id[type_end + 1:timestamp_start]
     
     if not bucket_name:
-        raise InvalidArtifactIdError(
-            f"Could not extract bucket name from artifact_id"
-        )
+        return "Could not extract bucket name from artifact_id"
     
     # Filename: everything except extension + .extension
-    base = '_'.join(parts[:-1])
-    filename = f"{base}.{ext}"
+    filename = f"{artifact_id[:ext_start]}.{artifact_id[ext_start + 1:]}"
     
-    return bucket_name, filename
+    return ParsedArtifact(bucket_name, filename)
 
 
-def get_file_from_bucket(project, bucket: str, filename: str) -> Optional[bytes]:
+def get_file_from_bucket(project, bucket: str, filename: str,
+                         cache_misses: bool = False) -> Optional[bytes]:
     """
     Retrieve file content from MinIO bucket.
     
@@ -59,21 +86,39 @@ def get_file_from_bucket(project, bucket: str, filename: str) -> Optional[bytes]
         project: Project object from RPC
         bucket: Bucket name
         filename: Filename to retrieve
+        cache_misses: Remember files storage reported as missing, so repeated
+            lookups skip the storage round trip. The cache is process-local:
+            a miss is served for up to MISSING_OBJECT_CACHE_TTL seconds and is
+            only cleared early by writes made through this plugin in the same
+            process - uploads from other workers or straight to storage stay
+            invisible until the entry expires. Only enable it where that
+            staleness is acceptable.
         
     Returns:
         File content as bytes, or None if not found
     """
     try:
-        mc = MinioClient(project, configuration_title=None)
+        mc = get_minio_client(project, configuration_title=None)
     except AttributeError as e:
         log.error(f"Error accessing storage: {e}")
         return None
     
+    return _download_file(mc, bucket, filename, cache_misses)
+
+
+def _download_file(mc, bucket: str, filename: str,
+                   cache_misses: bool = False) -> Optional[bytes]:
+    """Download a file with the given client, None if not found."""
+    if cache_misses and is_object_known_missing(mc, bucket, filename):
+        return None
+    
     try:
-        file_content = mc.download_file(bucket, filename)
-        return file_content
+        return mc.download_file(bucket, filename)
     except Exception as e:
-        log.debug(f"File {bucket}/{filename} not found in bucket: {e}")
+        log.debug("File %s/%s not found in bucket: %s", bucket, filename, e)
+        if cache_misses and isinstance(e, ClientError) \
+                and get_error_code(e) in ('NoSuchKey', 'NoSuchBucket', '404'):
+            remember_missing_object(mc, bucket, filename)
         return None
 
 
@@ -101,16 +146,23 @@ def extract_base64_from_content(content) -> Optional[bytes]:
             image_url = item.get('image_url', {}).get('url', '')
             if image_url.startswith('data:'):
                 # Extract base64 part after "data:image/png;base64,"
-                match = re.match(r'data:[^;]+;base64,(.+)', image_url)
-                if match:
+                marker = image_url.find(';base64,', 5)
+                if marker > 5 and image_url.find(';', 5, marker) == -1 \
+                        and len(image_url) > marker + 8:
+                    payload = image_url[marker + 8:]
+                    # Non-ASCII text can never be base64 (isascii() is O(1) for str)
+                    if not payload.isascii():
+                        return None
                     try:
-                        return base64.b64decode(match.group(1))
-                    except Exception:
+                        # binascii reads an ASCII str in place - no bytes copy
+                        return binascii.a2b_base64(payload)
+                    except binascii.Error:
                         return None
     
     return None
 
 
+@lru_cache(maxsize=4096)
 def validate_artifact_id(artifact_id: str) -> bool:
     """
     Validate artifact_id pattern.
@@ -127,24 +179,29 @@ def validate_artifact_id(artifact_id: str) -> bool:
     Returns:
         True if valid pattern, False otherwise
     """
-    parts = artifact_id.split('_')
+    # Shortest possible ID: type(3) + 3 separators + timestamp(1) + uuid(8)
+    if len(artifact_id) < 15:
+        return False
+    
+    # Locate the separators instead of splitting
+    type_end = artifact_id.find('_')
+    uuid_start = artifact_id.rfind('_')
+    timestamp_start = artifact_id.rfind('_', 0, uuid_start)
     
     # Must have at least 4 parts
-    if len(parts) < 4:
+    if uuid_start == -1 or timestamp_start <= type_end:
         return False
     
     # Type must be 3 letters
-    artifact_type = parts[0]
-    if len(artifact_type) != 3 or not artifact_type.isalpha():
+    if type_end != 3 or not artifact_id[:3].isalpha():
         return False
     
     # Timestamp must be numeric
-    timestamp = parts[-2]
-    if not timestamp.isdigit():
+    if not artifact_id[timestamp_start + 1:uuid_start].isdigit():
         return False
     
     # UUID must be 8 hex characters
-    uuid_part = parts[-1]
+    uuid_part = artifact_id[uuid_start + 1:]
     if len(uuid_part) != 8:
         return False
     try:
@@ -14,9 +14,17 @@
 
 """ Generic utility functions for artifacts plugin """
 
-from typing import Tuple
+from functools import lru_cache
+from typing import Iterable, List, Tuple
 
+from pylon.core.tools import log  # pylint: disable=E0611,E0401
 
+
+# S3 DeleteObjects accepts at most this many keys per request
+DELETE_OBJECTS_BATCH_SIZE = 1000
+
+
+@lru_cache(maxsize=2048)
 def parse_filepath(filepath: str) -> Tuple[str, str]:
     """
     Parse filepath into bucket and filename components.
@@ -33,11 +41,11 @@ def parse_filepath(filepath: str) -> Tuple[str, str]:
     # Remove leading slash if present
     path = filepath.lstrip('/')
     
-    if '/' not in path:
-        raise ValueError(f"Invalid filepath format: {filepath}. Expected /{'{bucket}'}/{'{filename}'}")
-    
     # Split on first slash only - filename may contain additional slashes (folders)
-    bucket, filename = path.split('/', 1)
+    bucket, separator, filename = path.partition('/')
+    
+    if not separator:
+        raise ValueError(f"Invalid filepath format: {filepath}. Expected /{'{bucket}'}/{'{filename}'}")
     
     if not bucket or not filename:
         raise ValueError(f"Invalid filepath format: {filepath}. Bucket and filename required.")
@@ -59,4 +67,27 @@ def make_filepath(bucket: str, filename: str) -> str:
     return f"/{bucket}/{filename}"
 
 
-
+def remove_files(mc, bucket: str, filenames: Iterable[str]) -> List[str]:
+    """
+    Delete several files from a bucket with batched DeleteObjects requests.
+    
+    Args:
+        mc: MinioClient of the project
+        bucket: Bucket name
+        filenames: File names to delete
+        
+    Returns:
+        File names storage failed to delete (empty if all were deleted)
+    """
+    keys = [{'Key': filename} for filename in filenames]
+    storage_bucket = mc.format_bucket_name(bucket)
+    failed = []
+    for start in range(0, len(keys), DELETE_OBJECTS_BATCH_SIZE):
+        result = mc.s3_client.delete_objects(
+            Bucket=storage_bucket,
+            Delete={'Objects': keys[start:start + DELETE_OBJECTS_BATCH_SIZE], 'Quiet': True}
+        )
+        for error in result.get('Errors', []):
+            log.warning("Failed to delete %s/%s: %s", bucket, error.get('Key'), error.get('Message'))
+            failed.append(error.get('Key'))
+    return failed